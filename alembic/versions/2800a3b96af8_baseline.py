@@ -0,0 +1,54 @@
+"""baseline
+
+Revision ID: 2800a3b96af8
+Revises: 
+Create Date: 2026-10-18 10:12:41.503218
+
+Schema as it existed before migrations were tracked in the repository.
+Databases created earlier with ``alembic revision --autogenerate`` can be
+marked as up to date with ``alembic stamp 2800a3b96af8``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2800a3b96af8'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=150), nullable=False),
+    sa.Column('password', sa.String(length=255), nullable=False),
+    sa.Column('refresh_token', sa.String(length=255), nullable=True),
+    sa.Column('confirmed', sa.Boolean(), nullable=True),
+    sa.Column('avatar', sa.String(length=255), nullable=True),
+    sa.Column('role', sa.Enum('admin', 'moderator', 'user', name='role'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('contacts',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('fullname', sa.String(length=150), nullable=True),
+    sa.Column('phone_number', sa.String(length=20), nullable=True),
+    sa.Column('email', sa.String(length=150), nullable=True),
+    sa.Column('birthday', sa.Date(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_contacts_email'), 'contacts', ['email'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_contacts_email'), table_name='contacts')
+    op.drop_table('contacts')
+    op.drop_table('users')
+    sa.Enum(name='role').drop(op.get_bind(), checkfirst=True)
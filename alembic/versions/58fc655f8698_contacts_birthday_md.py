@@ -0,0 +1,46 @@
+"""contacts birthday_md
+
+Revision ID: 58fc655f8698
+Revises: 2800a3b96af8
+Create Date: 2026-10-18 10:31:07.118342
+
+Adds a generated month*100+day column so upcoming-birthday lookups become a
+range scan on (user_id, birthday_md) instead of a full table scan.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '58fc655f8698'
+down_revision: Union[str, None] = '2800a3b96af8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column(
+        'birthday_md',
+        sa.Integer(),
+        sa.Computed('(EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday))::integer', persisted=True),
+        nullable=True,
+    ))
+    # Indexes on contacts are built and dropped CONCURRENTLY so writes are not
+    # blocked meanwhile. That cannot run inside a transaction, hence the
+    # autocommit block; later revisions follow the same pattern.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_contacts_user_id_birthday_md', 'contacts', ['user_id', 'birthday_md'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_contacts_user_id_birthday_md', table_name='contacts',
+            postgresql_concurrently=True, if_exists=True,
+        )
+    op.drop_column('contacts', 'birthday_md')
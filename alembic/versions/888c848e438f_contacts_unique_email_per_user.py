@@ -0,0 +1,40 @@
+"""contacts unique email per user
+
+Revision ID: 888c848e438f
+Revises: c6a64ff2a3d6
+Create Date: 2026-10-18 12:20:33.904417
+
+Contact emails were unique across all users; they are now unique per owner.
+The composite index also serves (user_id, email) lookups and is the
+conflict target of contact INSERT ... ON CONFLICT statements.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '888c848e438f'
+down_revision: Union[str, None] = 'c6a64ff2a3d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_contacts_user_id_email', 'contacts', ['user_id', 'email'], unique=True,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index('ix_contacts_email', table_name='contacts', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_contacts_email', 'contacts', ['email'], unique=True,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'uq_contacts_user_id_email', table_name='contacts', postgresql_concurrently=True, if_exists=True
+        )
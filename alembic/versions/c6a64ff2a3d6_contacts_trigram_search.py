@@ -0,0 +1,43 @@
+"""contacts trigram search
+
+Revision ID: c6a64ff2a3d6
+Revises: 58fc655f8698
+Create Date: 2026-10-18 11:04:52.370915
+
+GIN trigram indexes backing ILIKE '%x%' and similarity() in contact search.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a64ff2a3d6'
+down_revision: Union[str, None] = '58fc655f8698'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for column in ('fullname', 'email', 'phone_number'):
+            op.create_index(
+                f'ix_contacts_{column}_trgm',
+                'contacts',
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in ('fullname', 'email', 'phone_number'):
+            op.drop_index(
+                f'ix_contacts_{column}_trgm', table_name='contacts',
+                postgresql_concurrently=True, if_exists=True,
+            )
@@ -0,0 +1,41 @@
+"""contacts per-user indexes
+
+Revision ID: ee595eab9c3b
+Revises: 888c848e438f
+Create Date: 2026-10-18 13:02:15.661870
+
+Composite indexes for the per-user filters in src/repository/contacts.py.
+(user_id, email) and (user_id, birthday_md) already exist from earlier
+revisions.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ee595eab9c3b'
+down_revision: Union[str, None] = '888c848e438f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = {
+    'ix_contacts_user_id_id': ['user_id', 'id'],
+    'ix_contacts_user_id_fullname': ['user_id', 'fullname'],
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name, 'contacts', columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name='contacts', postgresql_concurrently=True, if_exists=True)
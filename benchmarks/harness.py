@@ -0,0 +1,102 @@
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+
+class Result:
+    def __init__(self, name: str, latencies: list[float], elapsed: float):
+        self.name = name
+        self.count = len(latencies)
+        self.throughput = self.count / elapsed if elapsed else 0.0
+        ordered = sorted(latencies)
+        self.p50_ms = percentile(ordered, 50) * 1000
+        self.p99_ms = percentile(ordered, 99) * 1000
+        self.mean_ms = statistics.fmean(ordered) * 1000 if ordered else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "throughput": round(self.throughput, 2),
+            "p50_ms": round(self.p50_ms, 4),
+            "p99_ms": round(self.p99_ms, 4),
+            "mean_ms": round(self.mean_ms, 4),
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<40} {self.count:>7} {self.throughput:>12.1f}/s "
+            f"{self.p50_ms:>10.3f} {self.p99_ms:>10.3f}"
+        )
+
+
+HEADER = f"{'benchmark':<40} {'count':>7} {'throughput':>14} {'p50 ms':>10} {'p99 ms':>10}"
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def measure_async(
+    name: str, fn: Callable[[int], Awaitable[None]], count: int, concurrency: int, warmup: int = 5
+) -> Result:
+    """
+    Runs ``fn(i)`` ``count`` times with at most ``concurrency`` calls in
+    flight and records the latency of each call.
+    """
+    for i in range(warmup):
+        await fn(-1 - i)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await fn(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return Result(name, latencies, time.perf_counter() - start)
+
+
+def measure_sync(name: str, fn: Callable[[], object], count: int, warmup: int = 100) -> Result:
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t)
+    return Result(name, latencies, time.perf_counter() - start)
+
+
+def save_baseline(path: Path, results: list[Result]):
+    path.write_text(json.dumps({r.name: r.to_dict() for r in results}, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(path: Path, results: list[Result], tolerance: float) -> list[str]:
+    """
+    Returns a line for every benchmark whose p50 or p99 is more than
+    ``tolerance`` (a fraction) slower than in the baseline file.
+    """
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+        current = result.to_dict()
+        for metric in ("p50_ms", "p99_ms"):
+            if previous[metric] and current[metric] > previous[metric] * (1 + tolerance):
+                change = (current[metric] / previous[metric] - 1) * 100
+                regressions.append(
+                    f"{result.name} {metric}: {previous[metric]:.3f} -> {current[metric]:.3f} (+{change:.0f}%)"
+                )
+    return regressions
@@ -0,0 +1,178 @@
+import itertools
+import random
+import uuid
+from datetime import date, timedelta
+
+import httpx
+from sqlalchemy import insert, select, update
+
+from benchmarks.harness import Result, measure_async
+from src.database.db import sessionmanager
+from src.entity.models import Contact, Role, User
+from src.services.hashing import pwd_context
+
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "benchmark-password"
+
+
+async def seed(contacts: int) -> int:
+    """
+    Creates a confirmed admin user with ``contacts`` contacts unless it
+    already exists. Returns the user id.
+    """
+    rng = random.Random(24)
+    async with sessionmanager.session() as db:
+        user_id = await db.scalar(select(User.id).filter(User.email == BENCH_EMAIL))
+        if user_id is None:
+            user_id = await db.scalar(
+                insert(User)
+                .values(
+                    username="bench",
+                    email=BENCH_EMAIL,
+                    password=pwd_context.hash(BENCH_PASSWORD),
+                    confirmed=True,
+                    role=Role.admin,
+                )
+                .returning(User.id)
+            )
+        else:
+            await db.execute(update(User).filter(User.id == user_id).values(role=Role.admin, confirmed=True))
+        existing = await db.scalar(select(Contact.id).filter(Contact.user_id == user_id).limit(1))
+        if existing is None:
+            for start in range(0, contacts, 1000):
+                await db.execute(
+                    insert(Contact),
+                    [
+                        {
+                            "fullname": f"Bench Contact {n}",
+                            "email": f"seed{n}@bench.example.com",
+                            "phone_number": f"+380{rng.randrange(10**9):09d}",
+                            "birthday": date(1970, 1, 1) + timedelta(days=rng.randrange(365 * 40)),
+                            "user_id": user_id,
+                        }
+                        for n in range(start, min(start + 1000, contacts))
+                    ],
+                )
+        await db.commit()
+    return user_id
+
+
+async def first_contact_id() -> int:
+    """
+    Id of one of the benchmark user's contacts. /all/page lists every user's
+    contacts, so it cannot be used when the database holds other data.
+    """
+    async with sessionmanager.session() as db:
+        return await db.scalar(
+            select(Contact.id).join(Contact.user).filter(User.email == BENCH_EMAIL).order_by(Contact.id).limit(1)
+        )
+
+
+async def login(client: httpx.AsyncClient) -> str:
+    response = await client.post("/auth/login", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def cursor_at(client: httpx.AsyncClient, depth: int) -> str | None:
+    """
+    Walks the keyset pagination to ``depth`` rows and returns the cursor.
+    """
+    cursor = None
+    walked = 0
+    while walked < depth:
+        step = min(500, depth - walked)
+        params = {"limit": step, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/contacts/contacts/all/page", params=params)
+        response.raise_for_status()
+        cursor = response.json()["next_cursor"]
+        walked += step
+        if cursor is None:
+            break
+    return cursor
+
+
+def checked(client: httpx.AsyncClient, method: str, url: str, **kwargs):
+    async def call(i: int):
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+    return call
+
+
+async def run(app, count: int, concurrency: int, depths: list[int], page_size: int) -> list[Result]:
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # bcrypt dominates login, so it gets fewer iterations.
+        results.append(
+            await measure_async("login", lambda i: login(client), max(1, count // 10), concurrency, warmup=1)
+        )
+        client.headers["Authorization"] = f"Bearer {await login(client)}"
+
+        results.append(await measure_async("get_current_user[/user/me]", checked(client, "GET", "/user/me/"), count, concurrency))
+
+        contact_id = await first_contact_id()
+        results.append(
+            await measure_async(
+                "contact_by_id", checked(client, "GET", f"/contacts/contacts/id/{contact_id}"), count, concurrency
+            )
+        )
+
+        for depth in depths:
+            results.append(
+                await measure_async(
+                    f"page_offset[depth={depth}]",
+                    checked(client, "GET", "/contacts/contacts/all", params={"limit": page_size, "offset": depth}),
+                    count,
+                    concurrency,
+                )
+            )
+            cursor = await cursor_at(client, depth)
+            params = {"limit": page_size, **({"cursor": cursor} if cursor else {})}
+            results.append(
+                await measure_async(
+                    f"page_cursor[depth={depth}]",
+                    checked(client, "GET", "/contacts/contacts/all/page", params=params),
+                    count,
+                    concurrency,
+                )
+            )
+
+        today = date.today().isoformat()
+        results.append(
+            await measure_async(
+                "birthdays_week[cached]",
+                checked(client, "GET", f"/contacts/contacts/by_birthday/{today}"),
+                count,
+                concurrency,
+            )
+        )
+        results.append(
+            await measure_async(
+                "birthdays_from_date_page",
+                checked(client, "GET", f"/contacts/contacts/get_new_day/{today}/page", params={"limit": page_size}),
+                count,
+                concurrency,
+            )
+        )
+
+        # Last: every create invalidates the user's cached contact responses.
+        run_id = uuid.uuid4().hex[:8]
+        numbers = itertools.count()
+
+        async def create(i: int):
+            n = next(numbers)
+            response = await client.post(
+                "/contacts/contacts",
+                json={
+                    "fullname": f"Created {run_id} {n}",
+                    "email": f"{run_id}-{n}@bench.example.com",
+                    "phone_number": "+380000000000",
+                    "birthday": "1990-05-17",
+                },
+            )
+            response.raise_for_status()
+
+        results.append(await measure_async("contact_create", create, count, concurrency))
+    return results
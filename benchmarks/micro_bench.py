@@ -0,0 +1,53 @@
+from datetime import date, datetime, timedelta
+
+from jose import jwt
+from pydantic import TypeAdapter
+
+from benchmarks.harness import Result, measure_sync
+from src.conf.config import settings
+from src.entity.models import Contact, Role, User
+from src.schemas import ContactListItem, ContactResponse
+from src.services.token_cache import DECODERS, VerifiedTokenCache
+
+
+def build_contacts(count: int) -> list[Contact]:
+    owner = User(id=1, username="bench", email="bench@example.com", avatar=None, role=Role.user)
+    return [
+        Contact(
+            id=i,
+            fullname=f"Contact {i}",
+            email=f"c{i}@example.com",
+            phone_number=f"+380{i:09d}",
+            birthday=date(1990, 1, 1) + timedelta(days=i % 365),
+            user=owner,
+        )
+        for i in range(count)
+    ]
+
+
+def run(count: int) -> list[Result]:
+    claims = {"sub": "bench@example.com", "scope": "access_token", "iat": datetime.now()}
+    claims["exp"] = datetime.now() + timedelta(minutes=15)
+    token = jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    decoder = DECODERS[settings.JWT_BACKEND](settings.SECRET_KEY, settings.ALGORITHM)
+    cache = VerifiedTokenCache(decoder, maxsize=16, max_ttl=settings.TOKEN_CACHE_TTL)
+
+    contacts = build_contacts(100)
+    list_adapter = TypeAdapter(list[ContactListItem])
+    detail_adapter = TypeAdapter(ContactResponse)
+
+    return [
+        measure_sync("jwt_encode", lambda: jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM), count),
+        measure_sync(f"jwt_decode_cold[{settings.JWT_BACKEND}]", lambda: decoder(token), count),
+        measure_sync(f"jwt_decode_cached[{settings.JWT_BACKEND}]", lambda: cache.decode(token), count),
+        measure_sync(
+            "serialize_contact_detail",
+            lambda: detail_adapter.dump_json(detail_adapter.validate_python(contacts[0], from_attributes=True)),
+            count,
+        ),
+        measure_sync(
+            "serialize_contact_list[100]",
+            lambda: list_adapter.dump_json(list_adapter.validate_python(contacts, from_attributes=True)),
+            max(1, count // 10),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# python -m benchmarks.run --save-baseline benchmarks/baseline.json
+# python -m benchmarks.run --compare benchmarks/baseline.json
+"""
+Load and micro benchmarks for the auth and contacts hot paths.
+
+The app runs in process behind httpx's ASGI transport, against the Postgres
+database from SQLALCHEMY_DATABASE_URL and the Redis from REDIS_URL. Use a
+scratch database migrated to head (alembic upgrade head): a benchmark user
+and its contacts are inserted on the first run. SQLite cannot stand in for
+Postgres here, the schema relies on a computed column, pg_trgm indexes and
+INSERT ... ON CONFLICT. --fakeredis replaces Redis with fakeredis; the rate
+limiter, token store and contact cache use Lua, so install ``fakeredis[lua]``.
+
+Rate limiting is switched off for the run. Numbers are only comparable on
+the same machine: save a baseline there before comparing.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Must be set before the settings are loaded.
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+from benchmarks import http_bench, micro_bench  # noqa: E402
+from benchmarks.harness import HEADER, compare, save_baseline  # noqa: E402
+from src.database.db import redispool, sessionmanager  # noqa: E402
+
+
+def use_fakeredis():
+    """
+    Backs the shared pool with fakeredis. The pool is swapped rather than
+    redispool.client, so clients built by the app (instrumented or not) and
+    the lifespan's redispool.init all end up on the same fake server.
+    """
+    from fakeredis import FakeServer, aioredis
+
+    server = FakeServer()
+
+    def init(url: str):
+        redispool._pool = aioredis.FakeRedis(server=server, decode_responses=True).connection_pool
+
+    redispool.init = init
+
+
+async def run_http(args) -> list:
+    from main import app
+
+    if args.fakeredis:
+        use_fakeredis()
+    await http_bench.seed(args.contacts)
+    async with app.router.lifespan_context(app):
+        return await http_bench.run(app, args.requests, args.concurrency, args.depths, args.page_size)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="requests per HTTP benchmark")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=20_000, help="iterations per micro benchmark")
+    parser.add_argument("--contacts", type=int, default=20_000, help="contacts seeded for the benchmark user")
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1_000, 10_000])
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--micro-only", action="store_true", help="skip the HTTP benchmarks")
+    parser.add_argument("--fakeredis", action="store_true")
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    results = micro_bench.run(args.iterations)
+    if not args.micro_only:
+        results += await run_http(args)
+        await sessionmanager.engine.dispose()
+
+    print(HEADER)
+    for result in results:
+        print(result)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.compare:
+        regressions = compare(args.compare, results, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"{len(regressions)} regressions against {args.compare}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,33 +1,44 @@
 # uvicorn main:app --host 127.0.0.1 --port 8000 --reload
 #pip install -r requirements.txt
-import re
-from ipaddress import ip_address
-from typing import Callable
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 import sys
 import os
-import redis.asyncio as redis
 from dotenv import load_dotenv
-from fastapi import FastAPI, status, Request
-from fastapi_limiter import FastAPILimiter
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 
+from src.conf.config import settings
+from src.database.db import redispool, sessionmanager
 from src.routes.contact_router import router as contact_router
 from src.routes.email_router import router as email_router
 from src.routes.auth_router import router as auth_router
 from src.routes.user_router import router as user_router
+from src.routes.admin_router import router as admin_router
+from src.routes.metrics_router import router as metrics_router
+from src.services import avatar, gravatar
+from src.services.ban import BanMiddleware, ban_list, start_ban_list_watcher
+from src.services.hashing import hashing_pool
+from src.services.metrics import MetricsMiddleware, instrument_engine, instrument_redis
+from src.services.profiler import ProfilerMiddleware, profiler, profiling_configured
 
 load_dotenv()# Загружаем переменные окружения до инициализации FastAP
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    r = await redis.Redis(
-        host="localhost", port=6379, db=0, encoding="utf-8", decode_responses=True
-    )
-    await FastAPILimiter.init(r)
+    redispool.init(settings.REDIS_URL)
+    ban_list_watcher = start_ban_list_watcher()
     yield
-    await r.close()
+    if ban_list_watcher is not None:
+        ban_list_watcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await ban_list_watcher
+    await redispool.close()
+    hashing_pool.shutdown()
+    await avatar.shutdown()
+    await gravatar.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -37,16 +48,21 @@ app.include_router(contact_router, prefix="/contacts", tags=["contacts"])
 app.include_router(email_router, prefix="/email", tags=["email"])
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(user_router, prefix="/user", tags=["user"])
+app.include_router(admin_router, prefix="/admin", tags=["admin"])
+
+if settings.METRICS_ENABLED:
+    instrument_engine(sessionmanager.engine)
+    instrument_redis(redispool)
+    app.include_router(metrics_router)
+
+if settings.AVATAR_STORAGE == "local":
+    settings.AVATAR_LOCAL_DIR.mkdir(parents=True, exist_ok=True)
+    app.mount(settings.AVATAR_LOCAL_URL, StaticFiles(directory=settings.AVATAR_LOCAL_DIR), name="avatars")
 
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
-banned_ips = [
-    ip_address("192.168.1.1"),
-    ip_address("192.168.1.2"),
-    #ip_address("127.0.0.1"),  # hometest
-]
 origins = ["*"]
 
 app.add_middleware(
@@ -57,29 +73,18 @@ app.add_middleware(
     allow_headers=["*"],  # "Autorization"
 )
 
-user_agent_ban_list = [
-    r"Googlebot",
-    r"Python-urllib",
-]  # Список регулярных выражений-шаблон
-
-
-@app.middleware("http")
-async def user_agent_ban_middleware(request: Request, call_next: Callable):
-    ip = ip_address(request.client.host)
-    if ip in banned_ips:
-        return JSONResponse(status_code=status.HTTP_403_FORBIDDEN, content={"detail": "You are banned"})
-    #print(request.headers.get("Authorization")) # Вывод: Bearer your_access_token_here
-
-    user_agent = request.headers.get("user-agent")
-    #print(user_agent)
-    for ban_pattern in user_agent_ban_list:
-        if re.search(ban_pattern, user_agent):
-            return JSONResponse(
-                status_code=status.HTTP_403_FORBIDDEN,
-                content={"detail": "You are banned"},
-            )
-    response = await call_next(request)
-    return response
+# Added last so it runs first: banned clients never reach CORS or routing.
+# Ban lists are configured with BAN_LIST_SOURCE (see src/services/ban.py).
+app.add_middleware(BanMiddleware, ban_list=ban_list)
+
+# Opt-in, see PROFILER_* settings; profiles are listed under /admin/profiles.
+if profiling_configured():
+    profiler.instrument_engine(sessionmanager.engine)
+    app.add_middleware(ProfilerMiddleware, profiler=profiler)
+
+# Outermost, so the latency histogram also covers banned and failed requests.
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/healthchecker")
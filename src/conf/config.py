@@ -9,9 +9,22 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int
 
     SQLALCHEMY_DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection, 0 disables
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000  # server side statement_timeout, 0 disables
 
     SECRET_KEY: str
     ALGORITHM: str
+    JWT_BACKEND: str = "jose"  # "jose" or "pyjwt"
+    TOKEN_CACHE_MAXSIZE: int = 10_000
+    TOKEN_CACHE_TTL: float = 900
+    ACCESS_TOKEN_EXPIRE_SECONDS: int = 15 * 60
+    REFRESH_TOKEN_EXPIRE_SECONDS: int = 7 * 24 * 3600
+    ROLE_CACHE_TTL: float = 5
 
     MAIL_USERNAME: str = "poshta@example.ua"
     MAIL_PASSWORD: str = "mypassword"
@@ -19,16 +32,71 @@ class Settings(BaseSettings):
 
     MAIL_PORT: int = 465
     MAIL_SERVER: str = "smtp.meta.ua"
+    MAIL_FROM_NAME: str = "goithw13"
     TEMPLATE_FOLDER: Path = Path(__file__).parent.parent / "templates"
 
     CLOUDINARY_NAME: str
     CLOUDINARY_API_KEY: str
     CLOUDINARY_API_SECRET: str
 
+    AVATAR_STORAGE: str = "cloudinary"  # "cloudinary" or "local"
+    AVATAR_LOCAL_DIR: Path = Path("media/avatars")
+    AVATAR_LOCAL_URL: str = "/media/avatars"
+    AVATAR_SIZE: int = 250
+    AVATAR_MAX_BYTES: int = 10 * 1024 * 1024
+    AVATAR_WORKERS: int = 2
+    AVATAR_UPLOAD_TIMEOUT: float = 30
+    AVATAR_STATUS_TTL: int = 3600
+
+    GRAVATAR_TIMEOUT: float = 5
+    GRAVATAR_CACHE_MAXSIZE: int = 10_000
+    GRAVATAR_CACHE_TTL: float = 24 * 3600
+
     REDIS_URL: str
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_password: str | None = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_SOCKET_TIMEOUT: float = 5
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 5
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REDIS_BACKOFF: float = 10
+    METRICS_ENABLED: bool = True
+
+    PROFILER_TOKEN: str | None = None
+    PROFILER_SAMPLE_RATE: float = 0.0
+    PROFILER_SLOW_MS: float = 0
+    PROFILER_INTERVAL_MS: float = 5
+    PROFILER_MAX_PROFILES: int = 50
+
+    USER_CACHE_MAXSIZE: int = 10_000
+    USER_CACHE_LOCAL_TTL: float = 30
+    USER_CACHE_REDIS_TTL: int = 300
+    CONTACT_CACHE_TTL: int = 60
+
+    EMAIL_DEDUPE_TTL: int = 300
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_POLL_TIMEOUT: float = 1
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BACKOFF: float = 30
+    EMAIL_SMTP_TIMEOUT: float = 30
+    EMAIL_SMTP_IDLE_TIMEOUT: float = 60
+
+    BAN_LIST_SOURCE: str = "static"  # "static", "file" or "redis"
+    BAN_LIST_FILE: Path | None = None
+    BAN_RELOAD_INTERVAL: float = 10
+
+    BCRYPT_ROUNDS: int = 12
+    HASH_POOL_KIND: str = "thread"  # "thread" or "process"
+    HASH_POOL_WORKERS: int = 4
+    HASH_MAX_CONCURRENCY: int = 8
+
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_ERRORS: int = 1000
+    IMPORT_MAX_LINE_BYTES: int = 64 * 1024
+    EXPORT_CHUNK_SIZE: int = 500
 
     class Config:
         env_file = "../../env"
@@ -1,13 +1,63 @@
 import contextlib
+import time
 
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.conf.config import settings
 import redis.asyncio as redis
 
 
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection
+    (including opening a new one when the pool is not full yet).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+
+def engine_options(url: str) -> dict:
+    """
+    Builds create_async_engine keyword arguments from the DB_* settings.
+    Driver specific arguments are only passed to asyncpg.
+    """
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.startswith("postgresql+asyncpg"):
+        connect_args = {
+            # SQLAlchemy's own prepared statement LRU and asyncpg's internal one.
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        options["connect_args"] = connect_args
+    return options
+
+
 class DataBaseSessionManager:
     def __init__(self, url: str):
         """
@@ -19,11 +69,15 @@ class DataBaseSessionManager:
         :param url: str: Create an engine
         :return: The class itself
         """
-        self._engine: AsyncEngine | None = create_async_engine(url)
+        self._engine: AsyncEngine | None = create_async_engine(url, **engine_options(url))
         self._session_maker: async_sessionmaker = async_sessionmaker(
-            autoflush=False, autocommit=False, bind=self._engine
+            autoflush=False, autocommit=False, expire_on_commit=False, bind=self._engine
         )
 
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._engine
+
     @contextlib.asynccontextmanager
     async def session(self):
         """
@@ -48,6 +102,28 @@ class DataBaseSessionManager:
         finally:
             await session.close()
 
+    def pool_stats(self) -> dict:
+        """
+        The pool_stats function returns live connection pool counters together
+        with the time sessions spent waiting for a connection.
+
+        :param self: Represent the instance of the class
+        :return: A dictionary with pool sizes and wait times in milliseconds
+        """
+        pool = self._engine.pool
+        stats = {"status": pool.status()}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if method is not None:
+                stats[name] = method()
+        if isinstance(pool, TimedQueuePool):
+            stats.update(
+                checkouts=pool.checkouts,
+                wait_avg_ms=round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+                wait_max_ms=round(pool.wait_max * 1000, 3),
+            )
+        return stats
+
 
 sessionmanager = DataBaseSessionManager(settings.SQLALCHEMY_DATABASE_URL)
 
@@ -65,9 +141,49 @@ async def get_db():
         yield session
 
 
+class RedisPoolManager:
+    """
+    Owns the single application-wide Redis connection pool. The pool is
+    created in the FastAPI lifespan; scripts and workers get it lazily on
+    first use.
+    """
+
+    client_class: type[redis.Redis] = redis.Redis
+
+    def __init__(self):
+        self._pool: redis.ConnectionPool | None = None
+
+    def init(self, url: str):
+        self._pool = redis.ConnectionPool.from_url(
+            url,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            encoding="utf-8",
+            decode_responses=True,
+        )
+
+    def client(self) -> redis.Redis:
+        if self._pool is None:
+            self.init(settings.REDIS_URL)
+        return self.client_class(connection_pool=self._pool)
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.disconnect()
+            self._pool = None
+
+
+redispool = RedisPoolManager()
+
+
 async def get_redis_client():
-    redis_client = redis.Redis.from_url(settings.REDIS_URL)
-    try:
-        yield redis_client
-    finally:
-        await redis_client.close()
+    """
+    The get_redis_client function is a dependency that yields a Redis client
+    backed by the shared connection pool. Clients are cheap to build and do not
+    own the pool, so nothing is closed afterwards.
+
+    :return: A redis.asyncio.Redis client
+    """
+    yield redispool.client()
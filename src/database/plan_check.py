@@ -0,0 +1,134 @@
+# python -m src.database.plan_check --seed
+"""
+Fails when a repository query would run as a sequential scan.
+
+Seeds (optionally) a dataset, runs the read functions of src/repository
+against it while recording the statements, then EXPLAINs every statement and
+exits with status 1 if a plan contains a Seq Scan on ``contacts`` or
+``users``. The EXPLAINs run with ``enable_seqscan = off``: on small tables a
+Seq Scan is the right plan, so only scans the planner cannot avoid, i.e.
+queries no index can serve, are reported. Run it against a scratch database
+migrated to head, never against production.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import insert, select, text
+
+from src.database.db import sessionmanager
+from src.database.query_counter import QueryCounter
+from src.entity.models import Contact, User
+from src.repository import contacts as repository_contacts
+from src.repository import users as repository_users
+
+
+CHECKED_TABLES = {"contacts", "users"}
+EMAIL_TEMPLATE = "plan-check-{}@example.com"
+
+
+async def seed(users: int, contacts_per_user: int):
+    rng = random.Random(13)
+    async with sessionmanager.session() as db:
+        exists = await db.scalar(select(User.id).filter(User.email == EMAIL_TEMPLATE.format(0)))
+        if exists is not None:
+            return
+        result = await db.execute(
+            insert(User).returning(User.id),
+            [
+                {"username": f"plan{i}", "email": EMAIL_TEMPLATE.format(i), "password": "-", "confirmed": True}
+                for i in range(users)
+            ],
+        )
+        user_ids = list(result.scalars())
+        for user_id in user_ids:
+            await db.execute(
+                insert(Contact),
+                [
+                    {
+                        "fullname": f"Contact {rng.randrange(10**6)} {n}",
+                        "email": f"c{n}@u{user_id}.example.com",
+                        "phone_number": f"+380{rng.randrange(10**9):09d}",
+                        "birthday": date(1970, 1, 1) + timedelta(days=rng.randrange(365 * 40)),
+                        "user_id": user_id,
+                    }
+                    for n in range(contacts_per_user)
+                ],
+            )
+        await db.commit()
+        await db.execute(text("ANALYZE users"))
+        await db.execute(text("ANALYZE contacts"))
+        await db.commit()
+
+
+async def capture() -> list[tuple[str, object]]:
+    async with sessionmanager.session() as db:
+        with QueryCounter(sessionmanager.engine) as counter:
+            user = await repository_users.get_user_by_email(EMAIL_TEMPLATE.format(1), db)
+            if user is None:
+                raise SystemExit("No seeded data, run with --seed first")
+            contact = (await repository_contacts.get_all_contacts_page(1, None, db))["items"][0]
+            page = await repository_contacts.get_all_contacts_page(10, None, db)
+            await repository_contacts.get_all_contacts_page(10, page["next_cursor"], db)
+            await repository_contacts.get_all_contacts(10, 0, db)
+            await repository_contacts.get_contact_by_id(1, 0, contact.id, db, user)
+            await repository_contacts.get_contact_by_fullname(1, 0, "Contact 1 1", db, user)
+            await repository_contacts.get_contact_by_email(1, 0, f"c1@u{user.id}.example.com", db, user)
+            await repository_contacts.get_upcoming_birthdays(db, user)
+            await repository_contacts.get_upcoming_birthdays_from_new_date("2024-12-28", 10, 0, db, user)
+            await repository_contacts.get_upcoming_birthdays_from_new_date_page("2024-06-01", 10, None, db, user)
+            await repository_contacts.search_contacts("Contact 12", 10, None, db, user)
+            async for _ in repository_contacts.stream_contacts(user.id, db, 10):
+                break
+    return list(zip(counter.statements, counter.parameters))
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in CHECKED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def check(statements: list[tuple[str, object]]) -> int:
+    failures = 0
+    async with sessionmanager.engine.connect() as conn:
+        await conn.begin()
+        # Seq Scans stay in a plan only when no index can serve the query.
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = result.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            tables = seq_scans(plan[0]["Plan"])
+            if tables:
+                failures += 1
+                print(f"Seq Scan on {', '.join(tables)}:\n{statement}\n")
+    return failures
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", action="store_true", help="insert the dataset if it is missing")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--contacts-per-user", type=int, default=250)
+    args = parser.parse_args()
+
+    if args.seed:
+        await seed(args.users, args.contacts_per_user)
+    statements = await capture()
+    failures = await check(statements)
+    await sessionmanager.engine.dispose()
+    print(f"{len(statements)} statements checked, {failures} with sequential scans")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,45 @@
+import contextlib
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """
+    Records every statement sent through an engine while active.
+
+    Usable from tests to lock in the number of queries per request::
+
+        with assert_max_queries(sessionmanager.engine, 2):
+            await client.get("/contacts/contacts/all")
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine.sync_engine
+        self.statements: list[str] = []
+        self.parameters: list = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return False
+
+
+@contextlib.contextmanager
+def assert_max_queries(engine: AsyncEngine, expected: int):
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > expected:
+        listing = "\n".join(f"{n}. {statement}" for n, statement in enumerate(counter.statements, 1))
+        raise AssertionError(f"Expected at most {expected} queries, {counter.count} were executed:\n{listing}")
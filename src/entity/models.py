@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Boolean, Column, Date, ForeignKey, Integer, String, Enum
+from sqlalchemy import Boolean, Column, Computed, Date, ForeignKey, Index, Integer, String, Enum
 
 # from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship  # declarative_base
@@ -23,11 +23,36 @@ class Contact(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     fullname = Column(String(150))
     phone_number = Column(String(20))
-    email = Column(String(150), unique=True, index=True)
+    email = Column(String(150))
     birthday = Column(Date)
+    # month * 100 + day, e.g. 1231 for 31 December; indexed together with
+    # user_id for upcoming-birthday range scans.
+    birthday_md = Column(
+        Integer,
+        Computed(
+            "(EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday))::integer",
+            persisted=True,
+        ),
+    )
     user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("User", back_populates="contacts")
 
+    __table_args__ = (
+        Index("ix_contacts_user_id_id", "user_id", "id"),
+        Index("ix_contacts_user_id_fullname", "user_id", "fullname"),
+        Index("uq_contacts_user_id_email", "user_id", "email", unique=True),
+        Index("ix_contacts_user_id_birthday_md", "user_id", "birthday_md"),
+        *(
+            Index(
+                f"ix_contacts_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+            for column in ("fullname", "email", "phone_number")
+        ),
+    )
+
 
 class User(Base):
     __tablename__ = "users"
@@ -1,44 +1,144 @@
 from datetime import date, datetime, timedelta
 from fastapi import Depends, HTTPException, Path, status
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import Integer, and_, case, cast, delete, func, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, raiseload
+from typing import AsyncIterator, List
 
 from src.database.db import get_db
 from src.entity.models import Contact, User
-from src.schemas import ContactSchema
+from src.conf.config import settings
+from src.schemas import ContactSchema, ContactUpdateSchema, ImportReport, ImportRowError
 from src.services.auth import auth_service
+from src.services.contact_cache import contact_cache
+from src.services.pagination import decode_cursor, encode_cursor
+
+# List queries are serialized without the owner: make an accidental lazy load
+# of Contact.user fail loudly instead of issuing one query per row. Single
+# contact queries load the owner in the same statement.
+LIST_OPTIONS = (raiseload(Contact.user),)
+DETAIL_OPTIONS = (joinedload(Contact.user),)
 
 
 async def create_contact(body: ContactSchema, db: AsyncSession, user: User):
-    contact = await db.execute(select(Contact).filter(Contact.email == body.email, Contact.user == user))
-    existing_contact = contact.scalar_one_or_none()
-    if existing_contact:
+    stmt = insert(Contact).values(**body.model_dump(), user_id=user.id)
+    stmt = stmt.on_conflict_do_nothing(index_elements=[Contact.user_id, Contact.email]).returning(Contact)
+    result = await db.scalars(stmt)
+    contact = result.one_or_none()
+    if contact is None:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Contact already exists!")  
-    contact = Contact(
-        fullname=body.fullname,
-        phone_number=body.phone_number,
-        email=body.email,
-        birthday=body.birthday,
-        user=user,
-    )
-    db.add(contact)
     await db.commit()
-    await db.refresh(contact)
+    await contact_cache.invalidate(contact.user_id)
     return contact
 
 
+async def _insert_contacts_batch(
+    batch: dict[str, tuple[int, dict]], db: AsyncSession, user_id: int, report: ImportReport
+):
+    existing = await db.execute(
+        select(Contact.email).filter(Contact.user_id == user_id, Contact.email.in_(batch))
+    )
+    for email in existing.scalars():
+        row, _ = batch.pop(email)
+        _add_import_error(report, row, "Contact already exists")
+    if not batch:
+        return
+    stmt = insert(Contact).values([values for _, values in batch.values()])
+    stmt = stmt.on_conflict_do_nothing(index_elements=[Contact.user_id, Contact.email]).returning(Contact.email)
+    result = await db.execute(stmt)
+    inserted = set(result.scalars())
+    await db.commit()
+    report.inserted += len(inserted)
+    for email, (row, _) in batch.items():
+        if email not in inserted:
+            _add_import_error(report, row, "Contact already exists")
+
+
+def _add_import_error(report: ImportReport, row: int, error: str):
+    report.skipped += 1
+    if len(report.errors) < settings.IMPORT_MAX_ERRORS:
+        report.errors.append(ImportRowError(row=row, error=error))
+    else:
+        report.errors_truncated = True
+
+
+async def import_contacts(
+    records: AsyncIterator[tuple[int, dict | None, str | None]], db: AsyncSession, user: User
+) -> ImportReport:
+    """
+    Validates streamed rows with ContactSchema and inserts them in batches of
+    IMPORT_BATCH_SIZE with one multi-row INSERT ... ON CONFLICT DO NOTHING each.
+    Rows that fail validation or duplicate an existing email are reported, not inserted.
+    """
+    user_id = user.id
+    report = ImportReport()
+    seen: set[str] = set()
+    batch: dict[str, tuple[int, dict]] = {}
+    async for row, data, error in records:
+        if error is not None:
+            _add_import_error(report, row, error)
+            continue
+        try:
+            contact = ContactSchema.model_validate(data)
+        except ValidationError as err:
+            message = "; ".join(
+                f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" for e in err.errors()
+            )
+            _add_import_error(report, row, message)
+            continue
+        if contact.email in seen:
+            _add_import_error(report, row, "Duplicate email in upload")
+            continue
+        seen.add(contact.email)
+        batch[contact.email] = (row, {**contact.model_dump(), "user_id": user_id})
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            await _insert_contacts_batch(batch, db, user_id, report)
+            batch = {}
+    if batch:
+        await _insert_contacts_batch(batch, db, user_id, report)
+    if report.inserted:
+        await contact_cache.invalidate(user_id)
+    return report
+
+
+async def stream_contacts(user_id: int, db: AsyncSession, chunk_size: int) -> AsyncIterator[Contact]:
+    """
+    Yields the user's contacts from a server-side cursor, fetching chunk_size rows at a time.
+    """
+    stmt = select(Contact).options(*LIST_OPTIONS).filter(Contact.user_id == user_id).order_by(Contact.id)
+    result = await db.stream_scalars(stmt.execution_options(yield_per=chunk_size))
+    async for contact in result:
+        yield contact
+
+
 async def get_all_contacts(limit: int, offset: int, db: AsyncSession = Depends(get_db)):
-    stmt = select(Contact).limit(limit).offset(offset)
+    stmt = select(Contact).options(*LIST_OPTIONS).order_by(Contact.id).limit(limit).offset(offset)
     contacts = await db.execute(stmt)
     return contacts.scalars().all()
 
 
+async def get_all_contacts_page(limit: int, cursor: str | None, db: AsyncSession):
+    stmt = select(Contact).options(*LIST_OPTIONS).order_by(Contact.id).limit(limit + 1)
+    if cursor is not None:
+        (last_id,) = decode_cursor(cursor, int)
+        stmt = stmt.filter(Contact.id > last_id)
+    result = await db.execute(stmt)
+    contacts = list(result.scalars().all())
+    next_cursor = None
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        next_cursor = encode_cursor(contacts[-1].id)
+    return {"items": contacts, "next_cursor": next_cursor}
+
+
 async def get_contact_by_id(
     limit: int, offset: int,    
-    contact_id: int = Path(ge=1), db: AsyncSession = Depends(get_db)
+    contact_id: int = Path(ge=1), db: AsyncSession = Depends(get_db), user: User = Depends(auth_service.get_current_user)
 ):
-    stmt = select(Contact).filter(Contact.id == contact_id).limit(limit).offset(offset)
+    stmt = select(Contact).options(*DETAIL_OPTIONS).filter(Contact.user_id == user.id, Contact.id == contact_id).limit(limit).offset(offset)
     result = await db.execute(stmt)
     if result is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="NOT FOUND")
@@ -47,7 +147,7 @@ async def get_contact_by_id(
 
 
 async def get_contact_by_fullname(limit: int, offset: int, contact_fullname: str, db: AsyncSession, user: User):
-    stmt = select(Contact).filter(
+    stmt = select(Contact).options(*DETAIL_OPTIONS).filter(
         Contact.user_id == user.id, Contact.fullname == contact_fullname
     ).limit(limit).offset(offset)
     result = await db.execute(stmt)
@@ -56,16 +156,83 @@ async def get_contact_by_fullname(limit: int, offset: int, contact_fullname: str
 
 
 async def get_contact_by_email(limit: int, offset: int, contact_email: str, db: AsyncSession, user: User):
-    stmt = select(Contact).filter(Contact.user == user, Contact.email == contact_email).limit(limit).offset(offset)
+    stmt = select(Contact).options(*DETAIL_OPTIONS).filter(Contact.user == user, Contact.email == contact_email).limit(limit).offset(offset)
     result = await db.execute(stmt)
     contact = result.scalar_one_or_none()
     return contact
 
 
-async def get_upcoming_birthdays(db: AsyncSession, user: User ):
-    current_date = date.today()
-    future_date = current_date + timedelta(days=7)
-    stmt = select(Contact).filter(current_date >= Contact.birthday, Contact.birthday <= future_date)
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def search_contacts(query: str, limit: int, cursor: str | None, db: AsyncSession, user: User):
+    """
+    Prefix, substring and fuzzy (pg_trgm) search over fullname, email and phone.
+
+    Results are ranked by trigram similarity with a bonus for prefix and
+    substring matches; the rank is an integer so it can be part of the cursor.
+    """
+    columns = (Contact.fullname, Contact.email, Contact.phone_number)
+    escaped = _escape_like(query)
+    prefix = or_(*(column.ilike(f"{escaped}%", escape="\\") for column in columns))
+    substring = or_(*(column.ilike(f"%{escaped}%", escape="\\") for column in columns))
+    fuzzy = or_(*(column.op("%")(query) for column in columns))
+    score = (
+        func.greatest(*(func.coalesce(func.similarity(column, query), 0) for column in columns))
+        + case((prefix, 1.0), else_=0.0)
+        + case((substring, 0.5), else_=0.0)
+    )
+    rank = cast(func.round(score * 1000), Integer)
+
+    stmt = select(Contact, rank).options(*LIST_OPTIONS).filter(Contact.user_id == user.id, or_(substring, fuzzy)).order_by(
+        rank.desc(), Contact.id
+    ).limit(limit + 1)
+    if cursor is not None:
+        last_rank, last_id = decode_cursor(cursor, int, int)
+        stmt = stmt.filter(or_(rank < last_rank, and_(rank == last_rank, Contact.id > last_id)))
+    result = await db.execute(stmt)
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0].id)
+    return {"items": [contact for contact, _ in rows], "next_cursor": next_cursor}
+
+
+def _month_day(day: date) -> int:
+    return day.month * 100 + day.day
+
+
+def _birthday_window(start: date, days: int = 7):
+    """
+    Returns the filter and the sort key for birthdays falling within ``days``
+    days after ``start``, ignoring the birth year. When the window crosses
+    New Year it is split into two ranges on ``birthday_md`` and contacts in
+    January sort after those in December.
+    """
+    start_md = _month_day(start)
+    end_md = _month_day(start + timedelta(days=days))
+    wrapped = case((Contact.birthday_md >= start_md, 0), else_=1)
+    if start_md <= end_md:
+        return Contact.birthday_md.between(start_md, end_md), wrapped
+    return or_(Contact.birthday_md >= start_md, Contact.birthday_md <= end_md), wrapped
+
+
+def _parse_date(new_date: str) -> date:
+    try:
+        return datetime.strptime(new_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Date must be in format YYYY-MM-DD"
+        )
+
+
+async def get_upcoming_birthdays(db: AsyncSession, user: User):
+    window, wrapped = _birthday_window(date.today())
+    stmt = select(Contact).options(*LIST_OPTIONS).filter(Contact.user_id == user.id, window).order_by(
+        wrapped, Contact.birthday_md, Contact.id
+    )
     result = await db.execute(stmt)
     contacts = result.scalars().all()
     return contacts
@@ -78,45 +245,77 @@ async def get_upcoming_birthdays_from_new_date(
     db: AsyncSession,
     user: User
 ) -> List[Contact]:
-    new_date_obj = datetime.strptime(new_date, "%Y-%m-%d").date()
-    future_date = new_date_obj + timedelta(days=7)
-    stmt = select(Contact).filter(
-        Contact.birthday >= new_date_obj, Contact.birthday <= future_date
+    window, wrapped = _birthday_window(_parse_date(new_date))
+    stmt = select(Contact).options(*LIST_OPTIONS).filter(Contact.user_id == user.id, window).order_by(
+        wrapped, Contact.birthday_md, Contact.id
     ).limit(limit).offset(offset)
     contacts = await db.execute(stmt)
     return contacts.scalars().all()
 
 
-async def update_contact(
-    body: ContactSchema, contact_id: int = Path(ge=1), db: AsyncSession = Depends(get_db), user: User = Depends(auth_service.get_current_user)
+async def get_upcoming_birthdays_from_new_date_page(
+    new_date: str,
+    limit: int,
+    cursor: str | None,
+    db: AsyncSession,
+    user: User
 ):
-    stmt = select(Contact).filter(Contact.user == user, Contact.id == contact_id)
+    start = _parse_date(new_date)
+    window, wrapped = _birthday_window(start)
+    stmt = select(Contact).options(*LIST_OPTIONS).filter(Contact.user_id == user.id, window).order_by(
+        wrapped, Contact.birthday_md, Contact.id
+    ).limit(limit + 1)
+    if cursor is not None:
+        last_md, last_id = decode_cursor(cursor, int, int)
+        last_wrapped = 0 if last_md >= _month_day(start) else 1
+        stmt = stmt.filter(
+            tuple_(wrapped, Contact.birthday_md, Contact.id) > tuple_(last_wrapped, last_md, last_id)
+        )
     result = await db.execute(stmt)
-    contact = result.scalar_one_or_none()
+    contacts = list(result.scalars().all())
+    next_cursor = None
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        next_cursor = encode_cursor(contacts[-1].birthday_md, contacts[-1].id)
+    return {"items": contacts, "next_cursor": next_cursor}
+
+
+async def update_contact(
+    body: ContactSchema | ContactUpdateSchema, contact_id: int = Path(ge=1), db: AsyncSession = Depends(get_db), user: User = Depends(auth_service.get_current_user)
+):
+    """
+    Writes only the fields present in the body with a single
+    UPDATE ... WHERE user_id AND id RETURNING. Returns None when the user has
+    no such contact; raises 409 when the new email is taken by another contact.
+    """
+    values = body.model_dump(exclude_unset=True, exclude_none=True)
+    if not values:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Nothing to update")
+    stmt = update(Contact).filter(Contact.user_id == user.id, Contact.id == contact_id).values(**values)
+    stmt = stmt.returning(Contact).execution_options(synchronize_session=False)
+    try:
+        result = await db.scalars(stmt)
+        contact = result.one_or_none()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Contact already exists!")
     if contact is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
-        )
-    contact.fullname = body.fullname
-    contact.email = body.email
-    contact.phone_number = body.phone_number
-    contact.birthday = body.birthday
-   
+        return None
     await db.commit()
-    await db.refresh(contact)
+    await contact_cache.invalidate(contact.user_id)
     return contact
 
 
 async def delete_contact(
-    contact_id: int = Path(ge=1), db: AsyncSession = Depends(get_db)
+    contact_id: int = Path(ge=1), db: AsyncSession = Depends(get_db), user: User = Depends(auth_service.get_current_user)
 ):
-    stmt = select(Contact).filter(Contact.id == contact_id)
+    stmt = delete(Contact).filter(Contact.user_id == user.id, Contact.id == contact_id).returning(Contact.user_id)
     result = await db.execute(stmt)
-    contact = result.scalar_one_or_none()
-    if result is None:
+    user_id = result.scalar_one_or_none()
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
-    await db.delete(contact)
     await db.commit()
+    await contact_cache.invalidate(user_id)
     return {"detail": "Contact deleted successfully"}
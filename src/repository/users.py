@@ -1,11 +1,15 @@
 from fastapi import Depends
-from libgravatar import Gravatar
-from sqlalchemy import select
+import httpx
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
-from src.entity.models import User
+from src.entity.models import Role, User
 from src.schemas import UserModel
+from src.services.cache import user_cache
+from src.services.contact_cache import contact_cache
+from src.services.gravatar import gravatar_exists, gravatar_url
+from src.services.token_store import refresh_token_store, role_changes
 
 
 async def get_user_by_email(email: str, db: AsyncSession = Depends(get_db)):
@@ -16,15 +20,10 @@ async def get_user_by_email(email: str, db: AsyncSession = Depends(get_db)):
 
 
 async def create_user(body: UserModel, db: AsyncSession = Depends(get_db)):
-    avatar = None
-    try:
-        g = Gravatar(body.email)
-        avatar = g.get_image()
-    except Exception as err:
-        print(err)
-
+    # The avatar stays empty: UserResponse falls back to the Gravatar URL and
+    # src.services.gravatar.refresh_gravatar stores it later if it exists.
     new_user = User(  # new_user = User(**body.model_dump(), avatar=avatar)
-        username=body.username, email=body.email, password=body.password, avatar=avatar
+        username=body.username, email=body.email, password=body.password
     )
     db.add(new_user)
     await db.commit()
@@ -32,8 +31,33 @@ async def create_user(body: UserModel, db: AsyncSession = Depends(get_db)):
     return new_user
 
 
-async def update_token(user: User, token: str | None, db: AsyncSession) -> None:
-    user.refresh_token = token
+async def update_gravatar(email: str, db: AsyncSession) -> None:
+    """
+    Stores the Gravatar URL on the user if a real image exists and no avatar
+    was set meanwhile. Meant to run in the background after signup.
+    """
+    try:
+        exists = await gravatar_exists(email)
+    except httpx.HTTPError as err:
+        print(err)
+        return
+    if not exists:
+        return
+    stmt = (
+        update(User)
+        .where(User.email == email, User.avatar.is_(None))
+        .values(avatar=gravatar_url(email))
+        .returning(User.id)
+    )
+    user_id = (await db.execute(stmt)).scalar_one_or_none()
+    await db.commit()
+    await user_cache.invalidate(email)
+    if user_id is not None:
+        await contact_cache.invalidate(user_id)
+
+
+async def update_password(user: User, hashed_password: str, db: AsyncSession) -> None:
+    user.password = hashed_password
     await db.commit()
 
 
@@ -41,6 +65,7 @@ async def confirmed_email(email: str, db: AsyncSession) -> None:
     user = await get_user_by_email(email, db)
     user.confirmed = True
     await db.commit()
+    await user_cache.invalidate(email)
 
 
 async def update_avatar_url(email: str, url: str | None, db: AsyncSession) -> User:
@@ -48,4 +73,25 @@ async def update_avatar_url(email: str, url: str | None, db: AsyncSession) -> Us
     user.avatar = url
     await db.commit()
     await db.refresh(user)
+    await user_cache.invalidate(email)
+    # Cached contact details embed the owner's avatar.
+    await contact_cache.invalidate(user.id)
+    return user
+
+
+async def update_role(email: str, role: Role, db: AsyncSession) -> User | None:
+    """
+    Changes the user's role and invalidates everything issued under the old
+    one: cached user and contacts, refresh tokens and (via role_changes)
+    access tokens.
+    """
+    stmt = update(User).where(User.email == email).values(role=role).returning(User)
+    user = (await db.execute(stmt)).scalar_one_or_none()
+    if user is None:
+        return None
+    await db.commit()
+    await user_cache.invalidate(email)
+    await contact_cache.invalidate(user.id)
+    await role_changes.record(email, role)
+    await refresh_token_store.revoke_all(email)
     return user
@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.db import get_db, sessionmanager
+from src.entity.models import Role
+from src.repository import users as repository_users
+from src.schemas import UserResponse
+from src.services.contact_cache import contact_cache
+from src.services.hashing import hashing_pool
+from src.services.profiler import Profile, profiler
+from src.services.role import RoleAccess
+
+
+router = APIRouter()
+access_to_admin = RoleAccess([Role.admin])
+
+
+@router.get("/db_pool", dependencies=[Depends(access_to_admin)])
+async def db_pool_stats():
+    return sessionmanager.pool_stats()
+
+
+@router.get("/hash_pool", dependencies=[Depends(access_to_admin)])
+async def hash_pool_stats():
+    return hashing_pool.stats()
+
+
+@router.get("/contact_cache", dependencies=[Depends(access_to_admin)])
+async def contact_cache_stats():
+    return contact_cache.stats()
+
+
+@router.patch("/users/{email}/role", response_model=UserResponse, dependencies=[Depends(access_to_admin)])
+async def change_user_role(email: str, role: Role, db: AsyncSession = Depends(get_db)):
+    user = await repository_users.update_role(email, role, db)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
+
+
+async def get_profile(profile_id: int) -> Profile:
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile
+
+
+@router.get("/profiles", dependencies=[Depends(access_to_admin)])
+async def list_profiles():
+    return [profile.summary() for profile in reversed(profiler.profiles)]
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(access_to_admin)])
+async def read_profile(profile: Profile = Depends(get_profile)):
+    return profile.to_dict()
+
+
+# Collapsed stacks, ready for flamegraph.pl or speedscope.
+@router.get(
+    "/profiles/{profile_id}/collapsed",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(access_to_admin)],
+)
+async def read_profile_collapsed(profile: Profile = Depends(get_profile)):
+    return profile.collapsed()
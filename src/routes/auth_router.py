@@ -1,4 +1,6 @@
 
+import uuid
+
 from fastapi import (
     APIRouter,
     BackgroundTasks,
@@ -17,10 +19,12 @@ from fastapi.security import (
 from sqlalchemy.ext.asyncio import AsyncSession
 import redis.asyncio as redis
  
-from src.database.db import get_db, get_redis_client
+from src.conf.config import settings
+from src.database.db import get_db, get_redis_client, sessionmanager
 from src.entity.models import User
 from src.schemas import UserModel, TokenModel, UserResponse
 from src.services.auth import auth_service
+from src.services.token_store import refresh_token_store
     
 from src.services.send_email import send_email
 #from src.repository.users import get_user_by_email, create_user, update_token
@@ -34,6 +38,12 @@ security = HTTPBearer()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
 
+async def refresh_gravatar(email: str):
+    # Runs after the response, when the request session is already closed.
+    async with sessionmanager.session() as db:
+        await repositories_users.update_gravatar(email, db)
+
+
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def signup(
     body: UserModel,
@@ -46,11 +56,12 @@ async def signup(
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Account already exists"
         )
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.get_password_hash_async(body.password)
     new_user = await repositories_users.create_user(body, db)
     background_tasks.add_task(
         send_email, new_user.email, new_user.username, request.base_url
     )
+    background_tasks.add_task(refresh_gravatar, new_user.email)
     return new_user
 
 
@@ -61,12 +72,20 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession =
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email")
     if not user.confirmed:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Email not confirmed")
-    if not auth_service.verify_password(body.password, user.password):#чистый пароль сравниваем с хешем
+    valid, new_hash = await auth_service.verify_and_update_password(body.password, user.password)#чистый пароль сравниваем с хешем
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password")
+    if new_hash is not None:
+        await repositories_users.update_password(user, new_hash, db)
     # Generate JWT
-    access_token = await auth_service.create_access_token(data={"sub": user.email, "test": "коза-дереза"})#это payload
-    refresh_token = await auth_service.create_refresh_token(data={"sub": user.email})
-    await repositories_users.update_token(user, refresh_token, db)
+    # The role claim lets RoleAccess authorize without loading the user.
+    role = user.role.value if user.role is not None else None
+    access_token = await auth_service.create_access_token(data={"sub": user.email, "role": role, "test": "коза-дереза"})#это payload
+    jti = uuid.uuid4().hex
+    refresh_token = await auth_service.create_refresh_token(
+        data={"sub": user.email, "jti": jti, "role": role}, expires_delta=settings.REFRESH_TOKEN_EXPIRE_SECONDS
+    )
+    await refresh_token_store.issue(user.email, jti, settings.REFRESH_TOKEN_EXPIRE_SECONDS)
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 
@@ -76,18 +95,37 @@ async def refresh_token(
     db: AsyncSession = Depends(get_db),
 ):
     token = credentials.credentials
-    email = await auth_service.get_email_from_refresh_token(token)
-    user = await repositories_users.get_user_by_email(email, db)
-    if user.refresh_token != token:
-        await repositories_users.update_token(user, None, db)
+    claims = await auth_service.get_refresh_token_claims(token)
+    email, jti = claims["sub"], claims["jti"]
+    new_jti = uuid.uuid4().hex
+    # A token that was already rotated or revoked logs the user out everywhere.
+    if not await refresh_token_store.rotate(email, jti, new_jti, settings.REFRESH_TOKEN_EXPIRE_SECONDS):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
       
-    access_token = await auth_service.create_access_token(data={"sub": email})
-    refresh_token = await auth_service.create_refresh_token(data={"sub": email})
-    user.refresh_token = refresh_token
-    await repositories_users.update_token(user, refresh_token, db)
+    # A role change revokes refresh tokens, so the claim is current. Tokens
+    # issued before roles were embedded fall back to one lookup.
+    role = claims.get("role")
+    if "role" not in claims:
+        user = await repositories_users.get_user_by_email(email, db)
+        role = user.role.value if user is not None and user.role is not None else None
+    access_token = await auth_service.create_access_token(data={"sub": email, "role": role})
+    refresh_token = await auth_service.create_refresh_token(
+        data={"sub": email, "jti": new_jti, "role": role}, expires_delta=settings.REFRESH_TOKEN_EXPIRE_SECONDS
+    )
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(credentials: HTTPAuthorizationCredentials = Security(security)):
+    claims = await auth_service.get_refresh_token_claims(credentials.credentials)
+    await refresh_token_store.revoke(claims["sub"], claims["jti"])
+
+
+@router.post("/logout_all")
+async def logout_all(user: User = Depends(auth_service.get_current_user)):
+    revoked = await refresh_token_store.revoke_all(user.email)
+    return {"message": "Logged out everywhere", "sessions": revoked}
+
 @router.get("/secret")
 async def read_item(user: User = Depends(auth_service.get_current_user)):
     return {"message": 'secret router', "owner": user.email}
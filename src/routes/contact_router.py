@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, Path, Query, status, HTTPException
+from fastapi import APIRouter, Depends, Path, Query, Request, Response, status, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi_limiter.depends import RateLimiter
 
+from datetime import date
 from typing import List
+from pydantic import TypeAdapter
 # import json
 from src.database.db import get_db
 from src.entity.models import User, Role
-from src.schemas import ContactResponse, ContactSchema
+from src.schemas import ContactListItem, ContactPage, ContactResponse, ContactSchema, ContactUpdateSchema, ImportReport
 from src.services.auth import auth_service
 from src.repository import contacts as repository_contacts
 from src.services.role import RoleAccess
+from src.services.contact_import import PARSERS
+from src.services.contact_export import MEDIA_TYPES, export_contacts
+from src.services.contact_cache import contact_cache
+from src.services.rate_limit import RateLimiter
 
 
 router = APIRouter()
 access_to_route_all = RoleAccess([Role.admin, Role.moderator])
+contact_adapter = TypeAdapter(ContactResponse)
+contact_list_adapter = TypeAdapter(list[ContactListItem])
 
 
 @router.get("/")
@@ -23,6 +31,7 @@ def main_root():
 
 @router.post(
     "/contacts",
+    response_model=ContactListItem,
     dependencies=[Depends(RateLimiter(times=2, seconds=5))],
 )
 async def create_contact(
@@ -33,9 +42,48 @@ async def create_contact(
     return await repository_contacts.create_contact(body, db, user)#user_id
 
 
+@router.post(
+    "/contacts/import",
+    response_model=ImportReport,
+    dependencies=[Depends(RateLimiter(times=1, seconds=10))],
+)
+async def import_contacts(
+    request: Request,
+    format: str | None = Query(default=None, description="csv or ndjson; taken from Content-Type if omitted"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(auth_service.get_current_user),
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    parser = PARSERS.get(format)
+    if parser is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Format must be csv or ndjson")
+    return await repository_contacts.import_contacts(parser(request.stream()), db, user)
+
+
+@router.get(
+    "/contacts/export",
+    dependencies=[Depends(RateLimiter(times=1, seconds=10))],
+)
+async def export_contacts_route(
+    response: Response,
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    user: User = Depends(auth_service.get_current_user),
+):
+    # The rate limiter writes its headers to the injected response, which a
+    # returned StreamingResponse replaces.
+    headers = {name: value for name, value in response.headers.items() if name.startswith("ratelimit-")}
+    return StreamingResponse(
+        export_contacts(user.id, format),
+        media_type=MEDIA_TYPES[format],
+        headers={**headers, "Content-Disposition": f'attachment; filename="contacts.{format}"'},
+    )
+
+
 @router.get(
     "/contacts/all",
-    response_model=list[ContactResponse],
+    response_model=list[ContactListItem],
     dependencies=[
         Depends(access_to_route_all),
         Depends(RateLimiter(times=1, seconds=20)),
@@ -50,6 +98,34 @@ async def get_all_contacts(
     return await repository_contacts.get_all_contacts(limit, offset, db)
 
 
+@router.get(
+    "/contacts/all/page",
+    response_model=ContactPage,
+    dependencies=[
+        Depends(access_to_route_all),
+        Depends(RateLimiter(times=1, seconds=20)),
+    ]
+)
+async def get_all_contacts_page(
+    limit: int = Query(default=10, ge=1, le=500),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(auth_service.get_current_user),
+):
+    return await repository_contacts.get_all_contacts_page(limit, cursor, db)
+
+
+@router.get("/contacts/search", response_model=ContactPage)
+async def search_contacts(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=100),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(auth_service.get_current_user),
+):
+    return await repository_contacts.search_contacts(q, limit, cursor, db, user)
+
+
 @router.get("/contacts/id/{contact_id}", response_model=ContactResponse)
 async def get_contact_by_id(
     limit: int = Query(default=10),
@@ -58,8 +134,11 @@ async def get_contact_by_id(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(auth_service.get_current_user),
 ):
-    contact = await repository_contacts.get_contact_by_id(
-        limit, offset, contact_id, db
+    contact = await contact_cache.cached_response(
+        user.id,
+        ("id", contact_id, limit, offset),
+        contact_adapter,
+        lambda: repository_contacts.get_contact_by_id(limit, offset, contact_id, db, user),
     )
     if contact is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="NOT FOUND")
@@ -74,8 +153,11 @@ async def get_contact_by_fullname(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(auth_service.get_current_user),
 ):
-    contact = await repository_contacts.get_contact_by_fullname(
-        limit, offset, contact_fullname, db, user
+    contact = await contact_cache.cached_response(
+        user.id,
+        ("name", contact_fullname, limit, offset),
+        contact_adapter,
+        lambda: repository_contacts.get_contact_by_fullname(limit, offset, contact_fullname, db, user),
     )
     if contact is None:
         raise HTTPException(status_code=404, detail="Contact not found")
@@ -90,22 +172,30 @@ async def get_contact_by_email(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(auth_service.get_current_user),
 ):
-    return await repository_contacts.get_contact_by_email(
-        limit, offset, contact_email, db, user
+    return await contact_cache.cached_response(
+        user.id,
+        ("email", contact_email, limit, offset),
+        contact_adapter,
+        lambda: repository_contacts.get_contact_by_email(limit, offset, contact_email, db, user),
     )
 
 
 @router.get(
-    "/contacts/by_birthday/{get_birthday}", response_model=list[ContactResponse]
+    "/contacts/by_birthday/{get_birthday}", response_model=list[ContactListItem]
 )
 async def get_upcoming_birthdays(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(auth_service.get_current_user),
 ):
-    return await repository_contacts.get_upcoming_birthdays(db, user)
+    return await contact_cache.cached_response(
+        user.id,
+        ("birthdays", date.today().isoformat()),
+        contact_list_adapter,
+        lambda: repository_contacts.get_upcoming_birthdays(db, user),
+    )
 
 
-@router.get("/contacts/get_new_day/{new_date}", response_model=list[ContactResponse])
+@router.get("/contacts/get_new_day/{new_date}", response_model=list[ContactListItem])
 async def get_upcoming_birthdays_from_new_date(
     new_date: str = Path(..., description="Current date in format YYYY-MM-DD"),
     limit: int = Query(default=10),
@@ -113,12 +203,28 @@ async def get_upcoming_birthdays_from_new_date(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(auth_service.get_current_user),
 ):
-    return await repository_contacts.get_upcoming_birthdays_from_new_date(
-        new_date, limit, offset, db, user
+    return await contact_cache.cached_response(
+        user.id,
+        ("new_day", new_date, limit, offset),
+        contact_list_adapter,
+        lambda: repository_contacts.get_upcoming_birthdays_from_new_date(new_date, limit, offset, db, user),
+    )
+
+
+@router.get("/contacts/get_new_day/{new_date}/page", response_model=ContactPage)
+async def get_upcoming_birthdays_from_new_date_page(
+    new_date: str = Path(..., description="Current date in format YYYY-MM-DD"),
+    limit: int = Query(default=10, ge=1, le=500),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(auth_service.get_current_user),
+):
+    return await repository_contacts.get_upcoming_birthdays_from_new_date_page(
+        new_date, limit, cursor, db, user
     )
 
 
-@router.put("/contacts/update/{contact_id}")
+@router.put("/contacts/update/{contact_id}", response_model=ContactListItem)
 async def update_contact(
     body: ContactSchema,
     contact_id: int = Path(..., ge=1),
@@ -133,13 +239,28 @@ async def update_contact(
     return contact
 
 
+@router.patch("/contacts/update/{contact_id}", response_model=ContactListItem)
+async def patch_contact(
+    body: ContactUpdateSchema,
+    contact_id: int = Path(..., ge=1),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(auth_service.get_current_user)
+):
+    contact = await repository_contacts.update_contact(body, contact_id, db, user)
+    if not contact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
+        )
+    return contact
+
+
 @router.delete("/contacts/delete/{contact_id}", response_model=dict)
 async def delete_contact(
     contact_id: int = Path(ge=1),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(auth_service.get_current_user),
 ):
-    result = await repository_contacts.delete_contact(contact_id, db)
+    result = await repository_contacts.delete_contact(contact_id, db, user)
     return result
 
 
@@ -1,6 +1,6 @@
 
 from fastapi import APIRouter, BackgroundTasks, Depends, Request, status, HTTPException, Response
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+from fastapi_mail import ConnectionConfig, FastMail
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi_mail.errors import ConnectionErrors
@@ -9,6 +9,7 @@ from src.conf.config import settings
 from src.database.db import get_db
 from src.schemas import EmailSchema, RequestEmail
 from src.services.send_email import send_email
+from src.services.email_queue import enqueue_email
 from src.repository import users as repositories_users
 #from src.repository.users import get_user_by_email, confirmed_email
 from src.services.auth import auth_service
@@ -31,16 +32,15 @@ router = APIRouter()
 fm = FastMail(conf)
 
 @router.post("/send-email")
-async def send_in_background(background_tasks: BackgroundTasks, body: EmailSchema):
+async def send_in_background(body: EmailSchema):
     try:
         token_verification = auth_service.create_email_token({"sub": body.email})
-        message = MessageSchema(
-            subject="Fastapi mail module",
-            recipients=[body.email],
-            template_body={"fullname": "Bill Murray", "host": "http://127.0.0.1:8000", "token": token_verification},
-            subtype=MessageType.html
+        await enqueue_email(
+            body.email,
+            "Fastapi mail module",
+            "email_template.html",
+            {"fullname": "Bill Murray", "host": "http://127.0.0.1:8000", "token": token_verification},
         )
-        background_tasks.add_task(fm.send_message, message, template_name="email_template.html")
         return {"message": "Email has been sent"}
     except ConnectionErrors as err:
         print(f"Connection error: {err}")
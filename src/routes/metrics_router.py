@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from src.database.db import sessionmanager
+from src.services.email_queue import queue_depth
+from src.services.hashing import hashing_pool
+from src.services.metrics import metrics_response
+
+
+router = APIRouter()
+
+
+# Scraped by Prometheus; expose it on an internal network only.
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return await metrics_response(sessionmanager.pool_stats(), hashing_pool.stats(), queue_depth)
@@ -1,15 +1,12 @@
-from fastapi import APIRouter, Depends, UploadFile, File
-from fastapi_limiter.depends import RateLimiter
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, status
 import cloudinary
-import cloudinary.uploader
 
-from src.database.db import get_db
 from src.entity.models import User
-from src.repository import users as repository_users
 from src.services.auth import auth_service
+from src.services.rate_limit import RateLimiter
+from src.services.avatar import get_avatar_status, process_avatar, read_upload, set_avatar_status
 from src.conf.config import settings
-from src.schemas import UserResponse
+from src.schemas import AvatarStatus, UserResponse
 
 router = APIRouter()
 cloudinary.config(
@@ -26,19 +23,25 @@ async def read_users_me(current_user: User = Depends(auth_service.get_current_us
 
 @router.patch(
     "/avatar",
-    response_model=UserResponse,
+    response_model=AvatarStatus,
+    status_code=status.HTTP_202_ACCEPTED,
     dependencies=[Depends(RateLimiter(times=1, seconds=20))],
 )
 async def update_avatar_url(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(),
     current_user: User = Depends(auth_service.get_current_user),
-    db: AsyncSession = Depends(get_db),
 ):
-    public_id = f"cloud_store/{current_user.email}"
-    #print(f"Generated public_id: {public_id}")
-    resource = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
-    #print(resource)
-    res_url = cloudinary.CloudinaryImage(f'cloud_store/{current_user.email}')\
-                        .build_url(width=250, height=250, crop='fill', version=resource.get('version'))
-    user = await repository_users.update_avatar_url(current_user.email, res_url, db)
-    return user
+    data = await read_upload(file, settings.AVATAR_MAX_BYTES)
+    await set_avatar_status(current_user.id, "processing")
+    # Resizing and uploading happen after the response is sent.
+    background_tasks.add_task(process_avatar, current_user.id, current_user.email, data)
+    return {"status": "processing"}
+
+
+@router.get("/avatar/status", response_model=AvatarStatus)
+async def avatar_status(current_user: User = Depends(auth_service.get_current_user)):
+    result = await get_avatar_status(current_user.id)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No avatar upload in progress")
+    return result
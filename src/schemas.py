@@ -1,7 +1,8 @@
 import datetime
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, model_validator
 from src.entity.models import Role
+from src.services.gravatar import gravatar_url
 
 
 class ContactSchema(BaseModel):
@@ -14,6 +15,13 @@ class ContactSchema(BaseModel):
         from_attributes = True
 
 
+class ContactUpdateSchema(BaseModel):
+    fullname: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone_number: Optional[str] = None
+    birthday: Optional[datetime.date] = None
+
+
 class UserModel(BaseModel):
     username: str
     email: EmailStr
@@ -35,6 +43,18 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+    @model_validator(mode="after")
+    def default_avatar(self):
+        if self.avatar is None:
+            self.avatar = gravatar_url(self.email)
+        return self
+
+
+class AvatarStatus(BaseModel):
+    status: str
+    avatar: Optional[str] = None
+    detail: Optional[str] = None
+
 
 class ContactResponse(ContactSchema):
     id: int
@@ -44,6 +64,31 @@ class ContactResponse(ContactSchema):
         from_attributes = True
 
 
+class ContactListItem(ContactSchema):
+    """Contact without the nested owner, for list endpoints."""
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class ContactPage(BaseModel):
+    items: list[ContactListItem]
+    next_cursor: Optional[str] = None
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    inserted: int = 0
+    skipped: int = 0
+    errors: list[ImportRowError] = []
+    errors_truncated: bool = False
+
+
 class TokenModel(BaseModel):
     access_token: str
     refresh_token: str
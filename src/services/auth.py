@@ -1,7 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 #from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,11 +10,14 @@ from fastapi.security import OAuth2PasswordBearer
 from src.conf.config import settings
 from src.database.db import get_db
 from src.repository import users as repository_users
+from src.services.cache import user_cache
+from src.services.hashing import hashing_pool, pwd_context
+from src.services.token_cache import token_cache
 
 
 
 class Auth:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = pwd_context
     SECRET_KEY = settings.SECRET_KEY
     ALGORITHM = settings.ALGORITHM
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -27,6 +29,17 @@ class Auth:
     def get_password_hash(self, password: str):
         return self.pwd_context.hash(password)
 
+    async def verify_and_update_password(self, plain_password: str, hashed_password: str):
+        """
+        Verifies the password on the hashing pool and returns ``(valid, new_hash)``.
+        ``new_hash`` is not None when the stored hash uses outdated settings
+        (e.g. a lower bcrypt cost) and should be replaced.
+        """
+        return await hashing_pool.verify_and_update(plain_password, hashed_password)
+
+    async def get_password_hash_async(self, password: str) -> str:
+        return await hashing_pool.hash(password)
+
 
     async def create_access_token(
         self, data: dict, expires_delta: Optional[float] = None
@@ -35,7 +48,7 @@ class Auth:
         if expires_delta:
             expire = datetime.now() + timedelta(seconds=expires_delta)
         else:
-            expire = datetime.now() + timedelta(minutes=15)
+            expire = datetime.now() + timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS)
         # to_encode.update({"exp": expire})
         to_encode.update(
             {"iat": datetime.now(), "exp": expire, "scope": "access_token"}
@@ -62,23 +75,25 @@ class Auth:
         )
         return encoded_refresh_token
 
-    async def decode_refresh_token(self, refresh_token: str):
+    def get_access_token_claims(self, token: str) -> dict:
+        """
+        Verifies an access token and returns its claims (shared, do not
+        mutate). Raises 401 for invalid tokens and other scopes.
+        """
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
         try:
-            payload = jwt.decode(
-                refresh_token, self.SECRET_KEY, algorithms=[self.ALGORITHM]
-            )
-            if payload["scope"] == "refresh_token":
-                email = payload["sub"]
-                return email
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid scope for token",
-            )
+            # Decode JWT, reusing claims of tokens verified before
+            payload = token_cache.decode(token)
         except JWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-            )
+            raise credentials_exception
+        if payload.get('scope') != 'access_token' or payload.get("sub") is None:
+            raise credentials_exception
+        return payload
 
     async def get_current_user(self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
         credentials_exception = HTTPException(
@@ -86,22 +101,16 @@ class Auth:
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+        email = self.get_access_token_claims(token)["sub"]
 
-        try:
-            # Decode JWT
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
-            if payload['scope'] == 'access_token':
-                email = payload["sub"]
-                if email is None:
-                    raise credentials_exception
-            else:
-                raise credentials_exception
-        except JWTError as e:
-            raise credentials_exception
+        user = await user_cache.get(email)
+        if user is not None:
+            return await db.merge(user, load=False)
 
         user = await repository_users.get_user_by_email(email, db)
         if user is None:
             raise credentials_exception
+        await user_cache.set(user)
         return user
 
     def create_email_token(self, data: dict):
@@ -124,14 +133,18 @@ class Auth:
             )
         
 
-    async def get_email_from_refresh_token(self, refresh_token: str):
+    async def get_refresh_token_claims(self, refresh_token: str) -> dict:
+        """
+        Verifies a refresh token and returns its claims (``sub``, ``jti`` and,
+        for tokens issued since roles are embedded, ``role``).
+        """
         try:
-            payload = jwt.decode(refresh_token,  self.SECRET_KEY, algorithms=[self.ALGORITHM])
-            if payload['scope'] == 'refresh_token':
-                email = payload['sub']
-                return email
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid scope for token')
+            payload = jwt.decode(refresh_token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
         except JWTError:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials')
+        if payload.get('scope') != 'refresh_token' or not payload.get('jti'):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid scope for token')
+        return payload
+
 
 auth_service = Auth()
\ No newline at end of file
@@ -0,0 +1,188 @@
+import asyncio
+import io
+import time
+import traceback
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cloudinary
+import cloudinary.utils
+import httpx
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.conf.config import settings
+from src.database.db import redispool, sessionmanager
+from src.repository import users as repository_users
+
+
+CHUNK_SIZE = 64 * 1024
+
+_executor = ThreadPoolExecutor(max_workers=settings.AVATAR_WORKERS, thread_name_prefix="avatar")
+
+
+async def read_upload(file: UploadFile, max_bytes: int) -> bytes:
+    """
+    Reads the upload in chunks (each read runs in Starlette's threadpool)
+    and refuses files larger than max_bytes.
+    """
+    chunks = []
+    size = 0
+    while chunk := await file.read(CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File is too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def resize_avatar(data: bytes, size: int) -> bytes:
+    """
+    Center-crops the image to a size x size square and encodes it as JPEG.
+    CPU bound: call it through the avatar executor.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        image = ImageOps.fit(image.convert("RGB"), (size, size), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, format="JPEG", quality=90, optimize=True)
+    return out.getvalue()
+
+
+class AvatarStorage(ABC):
+    @abstractmethod
+    async def save(self, public_id: str, data: bytes) -> str:
+        """Stores the JPEG bytes and returns the public URL of the avatar."""
+
+    async def close(self):
+        pass
+
+
+class CloudinaryStorage(AvatarStorage):
+    """
+    Uploads through Cloudinary's REST API with an async HTTP client instead
+    of the blocking cloudinary.uploader.
+    """
+
+    def __init__(self, cloud_name: str, api_key: str, api_secret: str, timeout: float):
+        self.cloud_name = cloud_name
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    async def save(self, public_id: str, data: bytes) -> str:
+        params = {"public_id": public_id, "overwrite": "true", "timestamp": str(int(time.time()))}
+        params["signature"] = cloudinary.utils.api_sign_request(params, self.api_secret)
+        params["api_key"] = self.api_key
+        response = await self.client.post(
+            f"https://api.cloudinary.com/v1_1/{self.cloud_name}/image/upload",
+            data=params,
+            files={"file": ("avatar.jpg", data, "image/jpeg")},
+        )
+        response.raise_for_status()
+        resource = response.json()
+        return cloudinary.CloudinaryImage(public_id).build_url(
+            width=settings.AVATAR_SIZE, height=settings.AVATAR_SIZE, crop="fill", version=resource.get("version")
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class LocalStorage(AvatarStorage):
+    """
+    Writes avatars to a local directory; meant for development and tests.
+    """
+
+    def __init__(self, directory: Path, base_url: str):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+
+    async def save(self, public_id: str, data: bytes) -> str:
+        name = public_id.replace("/", "_") + ".jpg"
+        path = self.directory / name
+        await asyncio.to_thread(self._write, path, data)
+        return f"{self.base_url}/{name}?v={int(time.time())}"
+
+    @staticmethod
+    def _write(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+def build_storage() -> AvatarStorage:
+    if settings.AVATAR_STORAGE == "local":
+        return LocalStorage(settings.AVATAR_LOCAL_DIR, settings.AVATAR_LOCAL_URL)
+    return CloudinaryStorage(
+        settings.CLOUDINARY_NAME,
+        settings.CLOUDINARY_API_KEY,
+        settings.CLOUDINARY_API_SECRET,
+        settings.AVATAR_UPLOAD_TIMEOUT,
+    )
+
+
+storage = build_storage()
+
+
+def _status_key(user_id: int) -> str:
+    return f"avatar:status:{user_id}"
+
+
+async def set_avatar_status(user_id: int, state: str, avatar: str | None = None, detail: str | None = None):
+    mapping = {"status": state, "avatar": avatar or "", "detail": detail or ""}
+    client = redispool.client()
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.hset(_status_key(user_id), mapping=mapping)
+        pipe.expire(_status_key(user_id), settings.AVATAR_STATUS_TTL)
+        await pipe.execute()
+
+
+async def get_avatar_status(user_id: int) -> dict | None:
+    data = await redispool.client().hgetall(_status_key(user_id))
+    if not data:
+        return None
+    return {"status": data["status"], "avatar": data["avatar"] or None, "detail": data["detail"] or None}
+
+
+async def process_avatar(user_id: int, email: str, data: bytes):
+    """
+    Background part of the avatar upload: resize in the worker pool, upload
+    to storage and save the URL with a session of its own. Every outcome ends
+    in a "done" or "failed" status, never a status stuck at "processing".
+    """
+    url = None
+    try:
+        loop = asyncio.get_running_loop()
+        resized = await loop.run_in_executor(_executor, resize_avatar, data, settings.AVATAR_SIZE)
+        url = await storage.save(f"cloud_store/{email}", resized)
+        async with sessionmanager.session() as db:
+            await repository_users.update_avatar_url(email, url, db)
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        state, detail = "failed", "Unsupported image format"
+    except (httpx.HTTPError, OSError) as err:
+        print(err)
+        state, detail = "failed", "Upload failed"
+    except Exception:
+        traceback.print_exc()
+        state, detail = "failed", "Processing failed"
+    else:
+        state, detail = "done", None
+    try:
+        await set_avatar_status(user_id, state, avatar=url if state == "done" else None, detail=detail)
+    except Exception:
+        traceback.print_exc()
+
+
+async def shutdown():
+    await storage.close()
+    _executor.shutdown(wait=False)
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import re
+from ipaddress import ip_address, ip_network
+from pathlib import Path
+from typing import Iterable
+
+import redis.asyncio as redis
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+from src.conf.config import settings
+from src.database.db import redispool
+
+
+DEFAULT_BANNED_IPS = [
+    "192.168.1.1",
+    "192.168.1.2",
+    # "127.0.0.1",  # hometest
+]
+DEFAULT_BANNED_USER_AGENTS = [
+    r"Googlebot",
+    r"Python-urllib",
+]
+
+# Version of a list that was never loaded: differs from any mtime or
+# ban:version value, including a missing key.
+NOT_LOADED = object()
+
+
+class BanList:
+    """
+    IP networks and user-agent patterns that are refused with 403.
+
+    IPs and CIDR ranges are grouped by prefix length, so a lookup costs one
+    mask-and-set-membership test per distinct prefix length. User-agent
+    patterns are combined into one precompiled regex. ``load`` swaps the whole
+    state in one assignment, so a reload never exposes a half-built list.
+    """
+
+    redis_ips_key = "ban:ips"
+    redis_user_agents_key = "ban:user_agents"
+    redis_version_key = "ban:version"
+
+    def __init__(self, ips: Iterable[str] = (), user_agents: Iterable[str] = ()):
+        self._state = ((), None)
+        self._version = NOT_LOADED
+        self.load(ips, user_agents)
+
+    def load(self, ips: Iterable[str], user_agents: Iterable[str]):
+        groups: dict[tuple[int, int], set[int]] = {}
+        for entry in ips:
+            network = ip_network(entry.strip(), strict=False)
+            groups.setdefault((network.version, network.prefixlen), set()).add(int(network.network_address))
+        networks = []
+        for (version, prefixlen), members in groups.items():
+            bits = 32 if version == 4 else 128
+            mask = ((1 << prefixlen) - 1) << (bits - prefixlen)
+            networks.append((version, mask, frozenset(members)))
+        patterns = [pattern for pattern in user_agents if pattern]
+        user_agent_re = re.compile("|".join(f"(?:{pattern})" for pattern in patterns)) if patterns else None
+        self._state = (tuple(networks), user_agent_re)
+
+    def is_banned(self, host: str | None, user_agent: str) -> bool:
+        networks, user_agent_re = self._state
+        if user_agent_re is not None and user_agent_re.search(user_agent):
+            return True
+        if not networks or not host:
+            return False
+        try:
+            ip = ip_address(host)
+        except ValueError:
+            return False
+        value = int(ip)
+        for version, mask, members in networks:
+            if version == ip.version and value & mask in members:
+                return True
+        return False
+
+    def load_file(self, path: Path):
+        """
+        Loads a JSON file of the form {"ips": [...], "user_agents": [...]}.
+        """
+        data = json.loads(path.read_text(encoding="utf-8"))
+        self.load(data.get("ips", []), data.get("user_agents", []))
+
+    async def load_redis(self, client: redis.Redis):
+        """
+        Loads the ``ban:ips`` and ``ban:user_agents`` sets. Bump ``ban:version``
+        after editing them so running workers pick up the change.
+        """
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.smembers(self.redis_ips_key)
+            pipe.smembers(self.redis_user_agents_key)
+            ips, user_agents = await pipe.execute()
+        self.load(ips, sorted(user_agents))
+
+    async def reload(self, source: str, path: Path | None = None):
+        if source == "file" and path is not None:
+            mtime = path.stat().st_mtime
+            if mtime != self._version:
+                self.load_file(path)
+                self._version = mtime
+        elif source == "redis":
+            client = redispool.client()
+            version = await client.get(self.redis_version_key)
+            if version != self._version:
+                await self.load_redis(client)
+                self._version = version
+
+    async def watch(self, source: str, path: Path | None, interval: float):
+        """
+        Reloads the list every ``interval`` seconds. A failed reload (e.g. an
+        invalid pattern) keeps the last good list and is retried; it never
+        stops the watcher.
+        """
+        while True:
+            try:
+                await self.reload(source, path)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                print(f"Ban list reload failed: {err!r}")
+            await asyncio.sleep(interval)
+
+
+class BanMiddleware:
+    """
+    Pure ASGI middleware refusing banned clients before routing.
+    """
+
+    def __init__(self, app, ban_list: BanList):
+        self.app = app
+        self.ban_list = ban_list
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        client = scope.get("client")
+        user_agent = ""
+        for name, value in scope["headers"]:
+            if name == b"user-agent":
+                user_agent = value.decode("latin-1")
+                break
+        if self.ban_list.is_banned(client[0] if client else None, user_agent):
+            response = JSONResponse(status_code=status.HTTP_403_FORBIDDEN, content={"detail": "You are banned"})
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+ban_list = BanList(DEFAULT_BANNED_IPS, DEFAULT_BANNED_USER_AGENTS)
+
+
+def start_ban_list_watcher() -> asyncio.Task | None:
+    if settings.BAN_LIST_SOURCE == "static":
+        return None
+    return asyncio.create_task(
+        ban_list.watch(settings.BAN_LIST_SOURCE, settings.BAN_LIST_FILE, settings.BAN_RELOAD_INTERVAL)
+    )
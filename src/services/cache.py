@@ -0,0 +1,129 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+import redis.asyncio as redis
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.conf.config import settings
+from src.database.db import redispool
+from src.entity.models import Role, User
+
+
+class LRUCache:
+    """
+    In-process LRU cache with a per-entry time to live.
+
+    Not thread safe: it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Credentials (password hash, refresh token) are deliberately not cached: they
+# are never read from the current user and should not sit in Redis.
+_USER_FIELDS = ("id", "username", "email", "confirmed", "avatar", "role")
+
+
+def _dump_user(user: User) -> str:
+    data = {field: getattr(user, field) for field in _USER_FIELDS}
+    data["role"] = user.role.value if user.role is not None else None
+    return json.dumps(data)
+
+
+def _load_user(raw: str | bytes) -> User:
+    data = json.loads(raw)
+    data["role"] = Role(data["role"]) if data["role"] is not None else None
+    user = User(**data)
+    # Mark the instance as persistent-but-detached so it can be merged into a
+    # request session without an INSERT or a SELECT.
+    make_transient_to_detached(user)
+    return user
+
+
+class UserCache:
+    """
+    Two-tier cache of authenticated users keyed by the token subject (email).
+
+    The local tier is a small LRU with a short TTL, the shared tier is Redis so
+    that invalidations made by one worker are seen by the others once their
+    local entry expires.
+    """
+
+    prefix = "user:"
+
+    def __init__(self, maxsize: int, local_ttl: float, redis_ttl: int):
+        self.local = LRUCache(maxsize, local_ttl)
+        self.redis_ttl = redis_ttl
+
+    @property
+    def redis(self) -> redis.Redis:
+        return redispool.client()
+
+    async def get(self, email: str) -> User | None:
+        raw = self.local.get(email)
+        if raw is None:
+            try:
+                raw = await self.redis.get(self.prefix + email)
+            except redis.RedisError as err:
+                print(err)
+                return None
+            if raw is None:
+                return None
+            self.local.set(email, raw)
+        return _load_user(raw)
+
+    async def set(self, user: User) -> None:
+        raw = _dump_user(user)
+        self.local.set(user.email, raw)
+        try:
+            await self.redis.set(self.prefix + user.email, raw, ex=self.redis_ttl)
+        except redis.RedisError as err:
+            print(err)
+
+    async def invalidate(self, email: str) -> None:
+        self.local.delete(email)
+        try:
+            await self.redis.delete(self.prefix + email)
+        except redis.RedisError as err:
+            print(err)
+
+
+user_cache = UserCache(
+    maxsize=settings.USER_CACHE_MAXSIZE,
+    local_ttl=settings.USER_CACHE_LOCAL_TTL,
+    redis_ttl=settings.USER_CACHE_REDIS_TTL,
+)
@@ -0,0 +1,113 @@
+from typing import Any, Awaitable, Callable
+
+import redis.asyncio as redis
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from src.conf.config import settings
+from src.database.db import redispool
+
+
+# Reads the per-user version and the entry stored under it in one round trip.
+LOOKUP_SCRIPT = """
+local version = redis.call('GET', KEYS[1]) or '0'
+return {version, redis.call('GET', ARGV[1] .. version .. ARGV[2])}
+"""
+
+
+class ContactCache:
+    """
+    Read-through cache for contact read endpoints.
+
+    Keys are namespaced per user and include a per-user version number.
+    Writes bump the version instead of deleting keys, so a response computed
+    before a write can never be served after it; old entries just expire.
+    Contact details embed the owner, so changes to the user's avatar or role
+    bump it too.
+    """
+
+    prefix = "contacts:"
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lookup = None
+
+    def _version_key(self, user_id: int) -> str:
+        return f"{self.prefix}{user_id}:version"
+
+    def _key(self, user_id: int, version: str, parts: tuple) -> str:
+        return f"{self.prefix}{user_id}:v{version}:" + ":".join(str(part) for part in parts)
+
+    async def lookup(self, user_id: int, parts: tuple) -> tuple[str, str | None]:
+        client = redispool.client()
+        if self._lookup is None:
+            self._lookup = client.register_script(LOOKUP_SCRIPT)
+        suffix = ":" + ":".join(str(part) for part in parts)
+        version, raw = await self._lookup(
+            keys=[self._version_key(user_id)],
+            args=[f"{self.prefix}{user_id}:v", suffix],
+            client=client,
+        )
+        return version, raw
+
+    async def store(self, user_id: int, version: str, parts: tuple, raw: bytes):
+        await redispool.client().set(self._key(user_id, version, parts), raw, ex=self.ttl)
+
+    async def invalidate(self, user_id: int):
+        try:
+            await redispool.client().incr(self._version_key(user_id))
+        except redis.RedisError as err:
+            self.errors += 1
+            print(err)
+
+    async def cached_response(
+        self,
+        user_id: int,
+        parts: tuple,
+        adapter: TypeAdapter,
+        load: Callable[[], Awaitable[Any]],
+    ) -> Response | None:
+        """
+        Returns the cached JSON for ``parts`` or calls ``load``, serializes the
+        result through ``adapter`` and caches it. Returns None, uncached, when
+        ``load`` returns None (a missing contact); an empty list is a valid
+        result and is cached, since creating a contact bumps the version.
+        """
+        version = None
+        try:
+            version, raw = await self.lookup(user_id, parts)
+        except redis.RedisError as err:
+            self.errors += 1
+            print(err)
+            raw = None
+        if raw is not None:
+            self.hits += 1
+            return Response(content=raw, media_type="application/json")
+        self.misses += 1
+
+        value = await load()
+        if value is None:
+            return None
+        raw = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+        if version is not None:
+            try:
+                await self.store(user_id, version, parts, raw)
+            except redis.RedisError as err:
+                self.errors += 1
+                print(err)
+        return Response(content=raw, media_type="application/json")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+contact_cache = ContactCache(ttl=settings.CONTACT_CACHE_TTL)
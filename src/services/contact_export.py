@@ -0,0 +1,53 @@
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from src.conf.config import settings
+from src.database.db import sessionmanager
+from src.entity.models import Contact
+from src.repository import contacts as repository_contacts
+
+EXPORT_FIELDS = ("id", "fullname", "email", "phone_number", "birthday")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _row(contact: Contact) -> dict:
+    row = {field: getattr(contact, field) for field in EXPORT_FIELDS}
+    row["birthday"] = contact.birthday.isoformat() if contact.birthday else None
+    return row
+
+
+def _encode_ndjson(rows: list[dict]) -> str:
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+
+def _encode_csv(rows: list[dict]) -> str:
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS).writerows(rows)
+    return buffer.getvalue()
+
+
+async def export_contacts(user_id: int, format: str) -> AsyncIterator[str]:
+    """
+    Streams the user's contacts encoded as NDJSON or CSV, EXPORT_CHUNK_SIZE rows per chunk.
+
+    The session is opened here rather than taken from get_db: dependencies with
+    yield are closed before a StreamingResponse body is sent.
+    """
+    encode = _encode_csv if format == "csv" else _encode_ndjson
+    if format == "csv":
+        yield ",".join(EXPORT_FIELDS) + "\r\n"
+    async with sessionmanager.session() as db:
+        rows = []
+        async for contact in repository_contacts.stream_contacts(user_id, db, settings.EXPORT_CHUNK_SIZE):
+            rows.append(_row(contact))
+            if len(rows) >= settings.EXPORT_CHUNK_SIZE:
+                yield encode(rows)
+                rows = []
+        if rows:
+            yield encode(rows)
@@ -0,0 +1,148 @@
+import csv
+import json
+from collections import deque
+from typing import AsyncIterator
+
+from src.conf.config import settings
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_length: int | None = None
+) -> AsyncIterator[tuple[int, str | None, str | None]]:
+    """
+    Splits a streamed request body into lines without buffering the whole body.
+    Yields ``(line_number, text, error)``; ``text`` is None when the line is not
+    valid UTF-8 or longer than ``max_length`` bytes. The rest of an overlong
+    line is skipped without being buffered.
+    """
+    max_length = settings.IMPORT_MAX_LINE_BYTES if max_length is None else max_length
+    buffer = b""
+    number = 0
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if skipping:
+                skipping = False
+                continue
+            yield (number, *_decode(line, max_length))
+        if len(buffer) > max_length:
+            if not skipping:
+                yield number + 1, None, f"Line longer than {max_length} bytes"
+                skipping = True
+            buffer = b""
+    if buffer and not skipping:
+        yield (number + 1, *_decode(buffer, max_length))
+
+
+def _decode(line: bytes, max_length: int) -> tuple[str | None, str | None]:
+    if len(line) > max_length:
+        return None, f"Line longer than {max_length} bytes"
+    try:
+        return line.rstrip(b"\r").decode("utf-8-sig"), None
+    except UnicodeDecodeError:
+        return None, "Invalid UTF-8"
+
+
+class _NeedMoreLines(Exception):
+    pass
+
+
+class _LineFeed:
+    """
+    Line source of the CSV reader. Running out of lines raises instead of
+    ending the input, so the reader never returns half of a record whose
+    quoted field continues on a line that has not arrived yet.
+    """
+
+    def __init__(self):
+        self.lines: deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise _NeedMoreLines
+        return self.lines.popleft()
+
+
+async def parse_csv(
+    chunks: AsyncIterator[bytes], max_length: int | None = None
+) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """
+    Yields ``(row, data, error)`` for every non-empty CSV record after the
+    header; ``row`` is the line the record starts on. Quoted fields may span
+    lines. A record longer than ``max_length`` ends the import, since where
+    the next record starts is unknown.
+    """
+    max_length = settings.IMPORT_MAX_LINE_BYTES if max_length is None else max_length
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    header = None
+    record: list[str] = []
+    size = 0
+    start = 0
+    async for number, line, error in iter_lines(chunks, max_length):
+        if error is not None:
+            yield (start if record else number), None, error
+            record, size = [], 0
+            continue
+        if not record:
+            if not line.strip():
+                continue
+            start = number
+        record.append(line + "\n")
+        size += len(line) + 1
+        if size > max_length:
+            yield start, None, f"Record longer than {max_length} bytes, import stopped"
+            return
+        # The reader restarts the record on every call, so feed it all of it.
+        feed.lines = deque(record)
+        try:
+            values = next(reader)
+        except _NeedMoreLines:
+            continue
+        except csv.Error as err:
+            yield start, None, f"Invalid CSV: {err}"
+            record, size = [], 0
+            continue
+        record, size = [], 0
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start, dict(zip(header, values)), None
+    if record:
+        yield start, None, "Unterminated quoted field"
+
+
+async def parse_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """
+    Yields ``(row, data, error)`` for every non-empty NDJSON line.
+    """
+    async for number, line, error in iter_lines(chunks):
+        if error is not None:
+            yield number, None, error
+            continue
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as err:
+            yield number, None, f"Invalid JSON: {err.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, data, None
+
+
+PARSERS = {
+    "csv": parse_csv,
+    "ndjson": parse_ndjson,
+}
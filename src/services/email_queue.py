@@ -0,0 +1,222 @@
+# python -m src.services.email_queue  # runs the email worker
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from email.message import EmailMessage
+from email.utils import formataddr
+
+import aiosmtplib
+import redis.asyncio as redis
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from src.conf.config import settings
+from src.database.db import redispool
+
+
+QUEUE_KEY = "email:queue"
+PROCESSING_KEY = "email:processing"
+RETRY_KEY = "email:retry"
+DEAD_KEY = "email:dead"
+DEDUPE_PREFIX = "email:dedupe:"
+
+# Pushes the job unless an identical one was queued within the dedupe window.
+ENQUEUE_SCRIPT = """
+if redis.call('SET', KEYS[2], '1', 'NX', 'EX', ARGV[2]) then
+    redis.call('LPUSH', KEYS[1], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+# Moves retries whose backoff has elapsed back to the queue.
+PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job in ipairs(due) do
+    redis.call('ZREM', KEYS[1], job)
+    redis.call('LPUSH', KEYS[2], job)
+end
+return #due
+"""
+
+
+def build_job(recipient: str, subject: str, template: str, body: dict) -> dict:
+    return {
+        "id": uuid.uuid4().hex,
+        "recipient": recipient,
+        "subject": subject,
+        "template": template,
+        "body": body,
+        "attempts": 0,
+    }
+
+
+def dedupe_key(recipient: str, subject: str, template: str) -> str:
+    digest = hashlib.sha256(f"{recipient}\0{subject}\0{template}".encode()).hexdigest()
+    return DEDUPE_PREFIX + digest
+
+
+async def enqueue_email(recipient: str, subject: str, template: str, body: dict) -> bool:
+    """
+    Queues a templated email for the worker. Returns False when the same
+    message (recipient, subject, template) was queued within EMAIL_DEDUPE_TTL.
+    """
+    client = redispool.client()
+    job = build_job(recipient, subject, template, body)
+    queued = await client.eval(
+        ENQUEUE_SCRIPT, 2, QUEUE_KEY, dedupe_key(recipient, subject, template),
+        json.dumps(job), settings.EMAIL_DEDUPE_TTL,
+    )
+    return bool(queued)
+
+
+async def queue_depth(client: redis.Redis | None = None) -> dict:
+    client = client or redispool.client()
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.llen(QUEUE_KEY)
+        pipe.llen(PROCESSING_KEY)
+        pipe.zcard(RETRY_KEY)
+        pipe.llen(DEAD_KEY)
+        queued, processing, retry, dead = await pipe.execute()
+    return {"queued": queued, "processing": processing, "retry": retry, "dead": dead}
+
+
+class EmailWorker:
+    """
+    Sends queued emails over one long-lived SMTP connection.
+
+    Jobs are moved atomically from the queue to a processing list, so a
+    crashed worker's jobs are requeued on the next start. Failed sends are
+    retried with exponential backoff and moved to a dead-letter list after
+    EMAIL_MAX_ATTEMPTS. Run a single worker per Redis instance: recovery on
+    start requeues everything left in the shared processing list.
+    """
+
+    def __init__(self, client: redis.Redis):
+        self.redis = client
+        self.smtp: aiosmtplib.SMTP | None = None
+        self.last_used = 0.0
+        self.env = Environment(
+            loader=FileSystemLoader(settings.TEMPLATE_FOLDER),
+            autoescape=select_autoescape(["html"]),
+        )
+        # Compile the templates once; Environment keeps them cached.
+        self.templates = {}
+        self.template("email_template.html")
+
+    def template(self, name: str):
+        template = self.templates.get(name)
+        if template is None:
+            template = self.templates[name] = self.env.get_template(name)
+        return template
+
+    def render(self, job: dict) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+        message["To"] = job["recipient"]
+        message["Subject"] = job["subject"]
+        message.set_content(self.template(job["template"]).render(**job["body"]), subtype="html")
+        return message
+
+    async def connect(self) -> aiosmtplib.SMTP:
+        if self.smtp is None or not self.smtp.is_connected:
+            self.smtp = aiosmtplib.SMTP(
+                hostname=settings.MAIL_SERVER,
+                port=settings.MAIL_PORT,
+                use_tls=True,
+                validate_certs=True,
+                timeout=settings.EMAIL_SMTP_TIMEOUT,
+            )
+            await self.smtp.connect()
+            await self.smtp.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+        return self.smtp
+
+    async def disconnect(self):
+        if self.smtp is not None and self.smtp.is_connected:
+            try:
+                await self.smtp.quit()
+            except aiosmtplib.SMTPException:
+                self.smtp.close()
+        self.smtp = None
+
+    async def fetch_batch(self) -> list[str]:
+        job = await self.redis.blmove(QUEUE_KEY, PROCESSING_KEY, settings.EMAIL_POLL_TIMEOUT, "RIGHT", "LEFT")
+        if job is None:
+            return []
+        batch = [job]
+        while len(batch) < settings.EMAIL_BATCH_SIZE:
+            job = await self.redis.lmove(QUEUE_KEY, PROCESSING_KEY, "RIGHT", "LEFT")
+            if job is None:
+                break
+            batch.append(job)
+        return batch
+
+    async def send_batch(self, batch: list[str]):
+        for raw in batch:
+            try:
+                await self.send(raw)
+            finally:
+                await self.redis.lrem(PROCESSING_KEY, 1, raw)
+
+    async def send(self, raw: str):
+        """
+        Sends one job. Any failure is handled here so a single bad message
+        (unknown template, missing field, broken JSON) cannot crash the
+        worker and be requeued by recover() forever.
+        """
+        try:
+            job = json.loads(raw)
+        except ValueError:
+            job = None
+        if not isinstance(job, dict) or "id" not in job or "recipient" not in job:
+            print(f"Malformed email job moved to the dead letter list: {raw[:200]!r}")
+            await self.redis.lpush(DEAD_KEY, raw)
+            return
+        try:
+            message = self.render(job)
+            smtp = await self.connect()
+            await smtp.send_message(message)
+            self.last_used = time.monotonic()
+        except (aiosmtplib.SMTPException, OSError) as err:
+            print(f"Email {job['id']} to {job['recipient']} failed: {err}")
+            await self.disconnect()
+            await self.retry(job)
+        except Exception as err:
+            print(f"Email {job['id']} to {job['recipient']} failed: {err!r}")
+            await self.retry(job)
+
+    async def retry(self, job: dict):
+        job["attempts"] = job.get("attempts", 0) + 1
+        if job["attempts"] >= settings.EMAIL_MAX_ATTEMPTS:
+            await self.redis.lpush(DEAD_KEY, json.dumps(job))
+            return
+        delay = settings.EMAIL_RETRY_BACKOFF * 2 ** (job["attempts"] - 1)
+        await self.redis.zadd(RETRY_KEY, {json.dumps(job): time.time() + delay})
+
+    async def recover(self):
+        while await self.redis.lmove(PROCESSING_KEY, QUEUE_KEY, "LEFT", "RIGHT") is not None:
+            pass
+
+    async def run(self):
+        await self.recover()
+        while True:
+            await self.redis.eval(PROMOTE_SCRIPT, 2, RETRY_KEY, QUEUE_KEY, time.time(), settings.EMAIL_BATCH_SIZE)
+            batch = await self.fetch_batch()
+            if batch:
+                await self.send_batch(batch)
+            elif self.smtp is not None and time.monotonic() - self.last_used > settings.EMAIL_SMTP_IDLE_TIMEOUT:
+                await self.disconnect()
+
+
+async def run_worker():
+    worker = EmailWorker(redispool.client())
+    try:
+        await worker.run()
+    finally:
+        await worker.disconnect()
+        await redispool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
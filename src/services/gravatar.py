@@ -0,0 +1,46 @@
+import hashlib
+from functools import lru_cache
+
+import httpx
+
+from src.conf.config import settings
+from src.services.cache import LRUCache
+
+
+GRAVATAR_URL = "https://www.gravatar.com/avatar/"
+
+_exists_cache = LRUCache(maxsize=settings.GRAVATAR_CACHE_MAXSIZE, ttl=settings.GRAVATAR_CACHE_TTL)
+_client: httpx.AsyncClient | None = None
+
+
+@lru_cache(maxsize=4096)
+def gravatar_url(email: str) -> str:
+    """
+    Gravatar URL for an email; pure, so it is memoized and never does IO.
+    """
+    digest = hashlib.md5(email.strip().lower().encode()).hexdigest()
+    return GRAVATAR_URL + digest
+
+
+async def gravatar_exists(email: str) -> bool:
+    """
+    Asks Gravatar whether a real image exists for the email (d=404 makes it
+    answer 404 instead of a placeholder). Answers are cached.
+    """
+    global _client
+    exists = _exists_cache.get(email)
+    if exists is not None:
+        return exists
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=settings.GRAVATAR_TIMEOUT)
+    response = await _client.head(gravatar_url(email), params={"d": "404"})
+    exists = response.status_code == 200
+    _exists_cache.set(email, exists)
+    return exists
+
+
+async def shutdown():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
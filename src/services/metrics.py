@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+import redis.asyncio as redis
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from redis.asyncio.client import Pipeline
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.database.db import RedisPoolManager
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed", ["operation"])
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_POOL = Gauge("db_pool_connections", "Database pool connections", ["state"])
+REDIS_LATENCY = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command round trip time",
+    ["command"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+BCRYPT_LATENCY = Histogram(
+    "bcrypt_duration_seconds",
+    "Time spent hashing or verifying passwords in the hashing pool",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1, 2.5),
+)
+HASH_POOL = Gauge("hash_pool_jobs", "Hashing pool jobs", ["state"])
+EMAIL_QUEUE = Gauge("email_queue_jobs", "Email queue jobs", ["state"])
+
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency. Requests are labelled by
+    route template (``/contacts/contacts/{contact_id}``), never by raw path,
+    so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the shared scope.
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    operation = statement.lstrip()[:6].upper()
+    operation = operation if operation in SQL_OPERATIONS else "OTHER"
+    DB_QUERIES.labels(operation).inc()
+    DB_QUERY_LATENCY.labels(operation).observe(time.perf_counter() - context._metrics_start)
+
+
+def instrument_engine(engine: AsyncEngine):
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_LATENCY.labels("PIPELINE").observe(time.perf_counter() - start)
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Redis client timing every command; pipelines are timed as a whole.
+    """
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_LATENCY.labels(str(args[0]).upper()).observe(time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+def instrument_redis(pool: RedisPoolManager):
+    pool.client_class = InstrumentedRedis
+
+
+async def metrics_response(pool_stats: dict, hash_stats: dict, queue_depth) -> Response:
+    """
+    Refreshes the gauges that are sampled rather than updated in place and
+    renders the default registry in the Prometheus text format.
+    """
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        if state in pool_stats:
+            DB_POOL.labels(state).set(pool_stats[state])
+    HASH_POOL.labels("waiting").set(hash_stats["queue_depth"])
+    HASH_POOL.labels("running").set(hash_stats["running"])
+    try:
+        depth = await asyncio.wait_for(queue_depth(), timeout=1)
+    except (redis.RedisError, asyncio.TimeoutError) as err:
+        print(f"Email queue depth unavailable: {err}")
+    else:
+        for state, value in depth.items():
+            EMAIL_QUEUE.labels(state).set(value)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
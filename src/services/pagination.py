@@ -0,0 +1,39 @@
+import base64
+import json
+
+from fastapi import HTTPException, status
+
+
+# Cursor ints are compared with INTEGER columns; larger values overflow there.
+INT_MIN = -2**31
+INT_MAX = 2**31 - 1
+
+
+def encode_cursor(*values) -> str:
+    """
+    Packs the sort key of the last row of a page into an opaque token.
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> list:
+    """
+    Unpacks a cursor made by encode_cursor, checking that it holds one value
+    of each of ``types`` and that ints fit a Postgres INTEGER. Anything else
+    is a 400, never a query error.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        # bool is an int subclass but never a valid key.
+        or any(isinstance(value, bool) or not isinstance(value, kind) for value, kind in zip(values, types))
+        or any(isinstance(value, int) and not INT_MIN <= value <= INT_MAX for value in values)
+    ):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
@@ -0,0 +1,222 @@
+import asyncio
+import hmac
+import itertools
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.conf.config import settings
+
+
+MAX_STACK_DEPTH = 64
+MAX_STATEMENT_LENGTH = 2000
+WAITING_FRAME = "(awaiting io)"
+
+
+def collapse(frame) -> str:
+    """
+    Renders a frame chain in the collapsed format used by flamegraph.pl and
+    speedscope: ``module:function;module:function`` from the root down.
+    """
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def on_stack(frame, root) -> bool:
+    """
+    True if ``root`` is ``frame`` or one of its callers. A task is running
+    exactly when its coroutine's frame is on the loop thread's stack.
+    """
+    while frame is not None:
+        if frame is root:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class Profile:
+    def __init__(self, profile_id: int, method: str, path: str, trigger: str, thread_id: int):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.route = None
+        self.status = None
+        self.trigger = trigger
+        self.thread_id = thread_id
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.samples: Counter[str] = Counter()
+        self.queries: list[dict] = []
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "samples": sum(self.samples.values()),
+            "queries": len(self.queries),
+        }
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def to_dict(self) -> dict:
+        return {**self.summary(), "sql": self.queries, "collapsed": self.collapsed()}
+
+
+class Profiler:
+    """
+    Opt-in sampling profiler for single requests.
+
+    While at least one request is profiled a daemon thread samples the event
+    loop thread every ``interval`` seconds. A sample is credited to the
+    profile whose task (registered by the middleware) is running at that
+    moment, i.e. whose coroutine frame is on the sampled stack; otherwise
+    the profiled request is waiting, which is recorded as ``(awaiting io)``. SQL statements are timed through engine events and
+    matched to the profile by task. Finished profiles go to a ring buffer of
+    the last ``maxlen`` entries.
+    """
+
+    def __init__(self, interval: float, maxlen: int, slow_ms: float):
+        self.interval = interval
+        self.slow_ms = slow_ms
+        self.profiles: deque[Profile] = deque(maxlen=maxlen)
+        self._active: dict[asyncio.Task, Profile] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self, task: asyncio.Task, method: str, path: str, trigger: str) -> Profile:
+        profile = Profile(next(self._ids), method, path, trigger, threading.get_ident())
+        self._active[task] = profile
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def finish(self, task: asyncio.Task, profile: Profile, duration_ms: float):
+        self._active.pop(task, None)
+        profile.duration_ms = duration_ms
+        if profile.trigger != "slow" or duration_ms >= self.slow_ms:
+            self.profiles.append(profile)
+
+    def current(self) -> Profile | None:
+        try:
+            return self._active.get(asyncio.current_task())
+        except RuntimeError:
+            return None
+
+    def get(self, profile_id: int) -> Profile | None:
+        for profile in self.profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def _sample(self):
+        while True:
+            time.sleep(self.interval)
+            active = dict(self._active)
+            if not active:
+                with self._lock:
+                    if not self._active:
+                        self._thread = None
+                        return
+                continue
+            frames = sys._current_frames()
+            for task, profile in active.items():
+                frame = frames.get(profile.thread_id)
+                if on_stack(frame, getattr(task.get_coro(), "cr_frame", None)):
+                    profile.samples[collapse(frame)] += 1
+                else:
+                    profile.samples[WAITING_FRAME] += 1
+
+    def record_query(self, statement: str, duration: float):
+        profile = self.current()
+        if profile is not None:
+            profile.queries.append(
+                {"statement": statement[:MAX_STATEMENT_LENGTH], "duration_ms": round(duration * 1000, 3)}
+            )
+
+    def instrument_engine(self, engine: AsyncEngine):
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._profiler_start = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.record_query(statement, time.perf_counter() - context._profiler_start)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+class ProfilerMiddleware:
+    """
+    Pure ASGI middleware deciding which requests to profile:
+
+    - ``X-Profile: <PROFILER_TOKEN>`` header, when a token is configured;
+    - a random PROFILER_SAMPLE_RATE fraction of requests;
+    - every request when PROFILER_SLOW_MS is set, keeping only those that
+      took longer than the threshold. This keeps the sampler running while
+      requests are in flight, so use a coarse PROFILER_INTERVAL_MS with it.
+    """
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+        self.token = settings.PROFILER_TOKEN.encode() if settings.PROFILER_TOKEN else None
+
+    def trigger(self, scope) -> str | None:
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == b"x-profile" and hmac.compare_digest(value, self.token):
+                    return "header"
+        if settings.PROFILER_SAMPLE_RATE and random.random() < settings.PROFILER_SAMPLE_RATE:
+            return "sampled"
+        if self.profiler.slow_ms:
+            return "slow"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self.trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        task = asyncio.current_task()
+        profile = self.profiler.start(task, scope["method"], scope["path"], trigger)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.route = getattr(scope.get("route"), "path", None)
+            self.profiler.finish(task, profile, (time.perf_counter() - start) * 1000)
+
+
+def profiling_configured() -> bool:
+    return bool(settings.PROFILER_TOKEN or settings.PROFILER_SAMPLE_RATE or settings.PROFILER_SLOW_MS)
+
+
+profiler = Profiler(
+    interval=settings.PROFILER_INTERVAL_MS / 1000,
+    maxlen=settings.PROFILER_MAX_PROFILES,
+    slow_ms=settings.PROFILER_SLOW_MS,
+)
@@ -0,0 +1,106 @@
+import math
+import time
+
+import redis.asyncio as redis
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from src.conf.config import settings
+from src.database.db import redispool
+from src.entity.models import User
+from src.services.auth import auth_service
+from src.services.cache import LRUCache
+
+
+# GCRA (generic cell rate algorithm) in one round trip. The key stores the
+# "theoretical arrival time" in milliseconds; Redis' clock is used so all
+# workers agree. Returns {allowed, remaining, retry_after_ms, reset_after_ms}.
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - tolerance
+if allow_at > now then
+    return {0, 0, allow_at - now, tat - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, math.floor((now - allow_at) / interval), 0, new_tat - now}
+"""
+
+
+class RateLimiter:
+    """
+    Per-user, per-route rate limit dependency.
+
+    Allows ``times`` requests per ``seconds`` on average plus ``burst`` extra
+    requests at once, evaluated with GCRA (a smooth sliding window) in a
+    single Redis call. Responses get ``RateLimit-*`` headers, where the limit
+    is the effective capacity ``times + burst``. If Redis is
+    unavailable the same algorithm runs in process, so limits then apply per
+    worker instead of globally. After a Redis error every limiter stays on
+    the local bucket for RATE_LIMIT_REDIS_BACKOFF seconds, so requests do not
+    each wait for the Redis timeout while it is down.
+    """
+
+    _script = None
+    _local = LRUCache(maxsize=100_000, ttl=3600)
+    _redis_retry_at = 0.0
+
+    def __init__(self, times: int, seconds: float, burst: int = 0):
+        self.limit = times + burst
+        self.interval = int(seconds * 1000 / times)
+        self.tolerance = self.interval * self.limit
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        user: User = Depends(auth_service.get_current_user),
+    ):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        route = request.scope.get("route")
+        key = f"ratelimit:{getattr(route, 'path', request.url.path)}:{user.id}"
+        if time.monotonic() < RateLimiter._redis_retry_at:
+            allowed, remaining, retry_after, reset_after = self._check_local(key)
+        else:
+            try:
+                allowed, remaining, retry_after, reset_after = await self._check_redis(key)
+            except redis.RedisError as err:
+                print(f"Rate limiter falling back to local buckets: {err}")
+                RateLimiter._redis_retry_at = time.monotonic() + settings.RATE_LIMIT_REDIS_BACKOFF
+                allowed, remaining, retry_after, reset_after = self._check_local(key)
+
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(remaining),
+            "RateLimit-Reset": str(math.ceil(reset_after / 1000)),
+        }
+        if not allowed:
+            headers["Retry-After"] = str(math.ceil(retry_after / 1000))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too Many Requests", headers=headers
+            )
+        response.headers.update(headers)
+
+    async def _check_redis(self, key: str) -> list[int]:
+        client = redispool.client()
+        if RateLimiter._script is None:
+            RateLimiter._script = client.register_script(GCRA_SCRIPT)
+        result = await RateLimiter._script(keys=[key], args=[self.interval, self.tolerance], client=client)
+        return [int(value) for value in result]
+
+    def _check_local(self, key: str) -> list[int]:
+        now = int(time.monotonic() * 1000)
+        tat = max(self._local.get(key) or now, now)
+        new_tat = tat + self.interval
+        allow_at = new_tat - self.tolerance
+        if allow_at > now:
+            return [0, 0, allow_at - now, tat - now]
+        self._local.set(key, new_tat, ttl=(new_tat - now) / 1000)
+        return [1, (now - allow_at) // self.interval, 0, new_tat - now]
@@ -1,17 +1,30 @@
-from fastapi import Request, Depends, HTTPException, status
+from fastapi import Depends, HTTPException, status
 
-from src.entity.models import Role, User
+from src.entity.models import Role
 from src.services.auth import auth_service
+from src.services.token_store import role_changes
 
 
 class RoleAccess:
+    """
+    Authorizes by the ``role`` claim of the access token, without loading the
+    user. Tokens issued before the user's role changed are refused (see
+    src.services.token_store.RoleChanges); tokens without a role claim must
+    be renewed by logging in again.
+    """
+
     def __init__(self, allowed_roles: list[Role]):
-        self.allowed_roles = allowed_roles
+        self.allowed_roles = frozenset(role.value for role in allowed_roles)
 
-    async def __call__(self, request: Request, user: User = Depends(auth_service.get_current_user)):
-        print(user.role, self.allowed_roles)
-        if user.role not in self.allowed_roles:
+    async def __call__(self, token: str = Depends(auth_service.oauth2_scheme)):
+        claims = auth_service.get_access_token_claims(token)
+        role = claims.get("role")
+        if role not in self.allowed_roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="FORBIDDEN")
+        current = await role_changes.current(claims["sub"])
+        if current is not None and current != role:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="FORBIDDEN"
-            )
\ No newline at end of file
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Role changed, please log in again",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
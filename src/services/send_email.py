@@ -1,10 +1,11 @@
-   
 from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
 from fastapi_mail.errors import ConnectionErrors
 from pydantic import EmailStr
+import redis.asyncio as redis
 
 from src.conf.config import settings
 from src.services.auth import auth_service
+from src.services.email_queue import enqueue_email
 
 
 
@@ -14,7 +15,7 @@ conf = ConnectionConfig(
     MAIL_FROM=settings.MAIL_FROM,
     MAIL_PORT=settings.MAIL_PORT,
     MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME="goithw13",
+    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
     MAIL_STARTTLS=False,
     MAIL_SSL_TLS=True,
     USE_CREDENTIALS=True,
@@ -24,16 +25,28 @@ conf = ConnectionConfig(
 
 
 async def send_email(email: EmailStr, username: str, host: str):
+    """
+    Queues the confirmation email for the email worker. If Redis is
+    unavailable the message is sent directly, as before the queue existed.
+    """
+    token_verification = auth_service.create_email_token({"sub": email})
+    subject = "Confirm your email "
+    template_body = {"host": str(host), "username": username, "token": token_verification}
+    try:
+        await enqueue_email(email, subject, "email_template.html", template_body)
+        return
+    except redis.RedisError as err:
+        print(err)
+
     try:
-        token_verification = auth_service.create_email_token({"sub": email})
         message = MessageSchema(
-            subject="Confirm your email ",
+            subject=subject,
             recipients=[email],
-            template_body={"host": host, "username": username, "token": token_verification},
+            template_body=template_body,
             subtype=MessageType.html
         )
 
         fm = FastMail(conf)
         await fm.send_message(message, template_name="email_template.html")
     except ConnectionErrors as err:
-        print(err)
\ No newline at end of file
+        print(err)
@@ -0,0 +1,80 @@
+import hashlib
+import time
+from typing import Callable
+
+from jose import JWTError, jwt
+
+from src.conf.config import settings
+from src.services.cache import LRUCache
+
+
+Decoder = Callable[[str], dict]
+
+
+def jose_decoder(secret_key: str, algorithm: str) -> Decoder:
+    def decode(token: str) -> dict:
+        return jwt.decode(token, secret_key, algorithms=[algorithm])
+    return decode
+
+
+def pyjwt_decoder(secret_key: str, algorithm: str) -> Decoder:
+    """
+    PyJWT is noticeably faster than python-jose for HS* tokens. It is an
+    optional dependency: install ``PyJWT`` and set JWT_BACKEND=pyjwt.
+    """
+    try:
+        import jwt as pyjwt
+    except ImportError as err:
+        raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT package") from err
+
+    def decode(token: str) -> dict:
+        try:
+            return pyjwt.decode(token, secret_key, algorithms=[algorithm])
+        except pyjwt.PyJWTError as err:
+            # Callers only handle python-jose's exception type.
+            raise JWTError(str(err)) from err
+    return decode
+
+
+DECODERS = {
+    "jose": jose_decoder,
+    "pyjwt": pyjwt_decoder,
+}
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of claims of tokens whose signature was already verified,
+    keyed by a SHA-256 digest of the token. An entry lives no longer than the
+    token's ``exp`` claim and is dropped if it is read after that.
+    Cached claims are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, decoder: Decoder, maxsize: int, max_ttl: float):
+        self.decoder = decoder
+        self.max_ttl = max_ttl
+        self._cache = LRUCache(maxsize, max_ttl)
+
+    def decode(self, token: str) -> dict:
+        key = hashlib.sha256(token.encode()).digest()
+        claims = self._cache.get(key)
+        now = time.time()
+        if claims is not None:
+            if claims["exp"] > now:
+                return claims
+            self._cache.delete(key)
+        claims = self.decoder(token)
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            self._cache.set(key, claims, ttl=min(self.max_ttl, exp - now))
+        return claims
+
+    def clear(self):
+        self._cache.clear()
+
+
+token_cache = VerifiedTokenCache(
+    DECODERS[settings.JWT_BACKEND](settings.SECRET_KEY, settings.ALGORITHM),
+    maxsize=settings.TOKEN_CACHE_MAXSIZE,
+    max_ttl=settings.TOKEN_CACHE_TTL,
+)
@@ -0,0 +1,125 @@
+import redis.asyncio as redis
+
+from src.conf.config import settings
+from src.database.db import redispool
+from src.entity.models import Role
+from src.services.cache import LRUCache
+
+
+PREFIX = "refresh:"
+USER_PREFIX = "refresh:user:"
+ROLE_PREFIX = "role:"
+
+# Deletes every refresh token of a user in one round trip.
+REVOKE_ALL_SCRIPT = """
+local jtis = redis.call('SMEMBERS', KEYS[1])
+for _, jti in ipairs(jtis) do
+    redis.call('DEL', ARGV[1] .. jti)
+end
+redis.call('DEL', KEYS[1])
+return #jtis
+"""
+
+# Swaps the old jti for the new one if the old one is still live. Presenting a
+# token that was already rotated or revoked means it leaked: every session of
+# the user is revoked and 0 is returned.
+ROTATE_SCRIPT = """
+if redis.call('GET', KEYS[2]) == ARGV[2] then
+    redis.call('DEL', KEYS[2])
+    redis.call('SREM', KEYS[1], ARGV[3])
+    redis.call('SET', KEYS[3], ARGV[2], 'EX', ARGV[5])
+    redis.call('SADD', KEYS[1], ARGV[4])
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+    return 1
+end
+local jtis = redis.call('SMEMBERS', KEYS[1])
+for _, jti in ipairs(jtis) do
+    redis.call('DEL', ARGV[1] .. jti)
+end
+redis.call('DEL', KEYS[1])
+return 0
+"""
+
+
+class RefreshTokenStore:
+    """
+    Live refresh tokens kept in Redis instead of users.refresh_token.
+
+    ``refresh:<jti>`` holds the owner's email and expires with the token;
+    ``refresh:user:<email>`` is the set of the user's live jtis, so a user can
+    have several sessions and all of them can be revoked in one call.
+    """
+
+    @property
+    def redis(self) -> redis.Redis:
+        return redispool.client()
+
+    async def issue(self, email: str, jti: str, ttl: int):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(PREFIX + jti, email, ex=ttl)
+            pipe.sadd(USER_PREFIX + email, jti)
+            pipe.expire(USER_PREFIX + email, ttl)
+            await pipe.execute()
+
+    async def rotate(self, email: str, old_jti: str, new_jti: str, ttl: int) -> bool:
+        rotated = await self.redis.eval(
+            ROTATE_SCRIPT, 3,
+            USER_PREFIX + email, PREFIX + old_jti, PREFIX + new_jti,
+            PREFIX, email, old_jti, new_jti, ttl,
+        )
+        return bool(rotated)
+
+    async def revoke(self, email: str, jti: str):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(PREFIX + jti)
+            pipe.srem(USER_PREFIX + email, jti)
+            await pipe.execute()
+
+    async def revoke_all(self, email: str) -> int:
+        return await self.redis.eval(REVOKE_ALL_SCRIPT, 1, USER_PREFIX + email, PREFIX)
+
+
+refresh_token_store = RefreshTokenStore()
+
+
+class RoleChanges:
+    """
+    Current role of users whose role changed less than an access token
+    lifetime ago.
+
+    Access tokens carry the role they were issued with, so authorization
+    needs no DB read. After a change ``role:<email>`` holds the new role until
+    every token issued before it has expired; a token whose role differs is
+    refused. Lookups are cached per worker for ``local_ttl`` seconds, which
+    bounds how long a revoked token keeps working there.
+    """
+
+    def __init__(self, ttl: int, local_ttl: float):
+        self.ttl = ttl
+        self.local = LRUCache(maxsize=settings.USER_CACHE_MAXSIZE, ttl=local_ttl)
+
+    @property
+    def redis(self) -> redis.Redis:
+        return redispool.client()
+
+    async def record(self, email: str, role: Role):
+        await self.redis.set(ROLE_PREFIX + email, role.value, ex=self.ttl)
+        self.local.set(email, role.value)
+
+    async def current(self, email: str) -> str | None:
+        """
+        Returns the recorded role, or None when the role did not change
+        recently (or Redis is unavailable).
+        """
+        role = self.local.get(email)
+        if role is None:
+            try:
+                role = await self.redis.get(ROLE_PREFIX + email) or ""
+            except redis.RedisError as err:
+                print(err)
+                return None
+            self.local.set(email, role)
+        return role or None
+
+
+role_changes = RoleChanges(ttl=settings.ACCESS_TOKEN_EXPIRE_SECONDS, local_ttl=settings.ROLE_CACHE_TTL)
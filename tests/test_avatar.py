@@ -0,0 +1,53 @@
+import asyncio
+import io
+
+import fakeredis.aioredis
+import pytest
+from PIL import Image
+
+from src.database.db import redispool
+from src.services import avatar
+
+
+def _jpeg() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (40, 30), "red").save(out, format="JPEG")
+    return out.getvalue()
+
+
+class BrokenStorage(avatar.AvatarStorage):
+    async def save(self, public_id: str, data: bytes) -> str:
+        raise RuntimeError("unexpected")
+
+
+def test_unexpected_error_marks_avatar_failed(monkeypatch, capsys):
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redispool, "client", lambda: client)
+    monkeypatch.setattr(avatar, "storage", BrokenStorage())
+
+    async def run():
+        await avatar.set_avatar_status(1, "processing")
+        await avatar.process_avatar(1, "a@example.com", _jpeg())
+        return await avatar.get_avatar_status(1)
+
+    assert asyncio.run(run()) == {"status": "failed", "avatar": None, "detail": "Processing failed"}
+    assert "RuntimeError: unexpected" in capsys.readouterr().err
+
+
+def test_not_an_image_marks_avatar_failed(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redispool, "client", lambda: client)
+
+    async def run():
+        await avatar.process_avatar(2, "b@example.com", b"not an image")
+        return await avatar.get_avatar_status(2)
+
+    assert asyncio.run(run())["detail"] == "Unsupported image format"
+
+
+def test_storage_without_save_cannot_be_built():
+    class Incomplete(avatar.AvatarStorage):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
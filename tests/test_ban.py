@@ -0,0 +1,51 @@
+import asyncio
+import json
+import os
+
+import fakeredis.aioredis
+import pytest
+
+from src.database.db import redispool
+from src.services.ban import BanList
+
+
+def test_watch_survives_invalid_pattern_and_loads_later_fix(tmp_path, capsys):
+    path = tmp_path / "ban.json"
+    path.write_text(json.dumps({"ips": ["10.0.0.0/8"], "user_agents": ["curl"]}))
+    ban_list = BanList()
+
+    async def run():
+        task = asyncio.create_task(ban_list.watch("file", path, 0.01))
+        await asyncio.sleep(0.05)
+        assert ban_list.is_banned("10.1.2.3", "")
+
+        path.write_text(json.dumps({"ips": [], "user_agents": ["(unclosed"]}))
+        os.utime(path, (1, 1))
+        await asyncio.sleep(0.05)
+        # The last good list stays active.
+        assert ban_list.is_banned("10.1.2.3", "curl/8")
+
+        path.write_text(json.dumps({"ips": ["192.0.2.1"], "user_agents": []}))
+        os.utime(path, (2, 2))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert ban_list.is_banned("192.0.2.1", "")
+    assert not ban_list.is_banned("10.1.2.3", "curl/8")
+    assert "Ban list reload failed" in capsys.readouterr().out
+
+
+def test_redis_list_loads_without_version_key(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redispool, "client", lambda: client)
+    ban_list = BanList()
+
+    async def run():
+        await client.sadd(BanList.redis_ips_key, "198.51.100.7")
+        await ban_list.reload("redis")
+
+    asyncio.run(run())
+    assert ban_list.is_banned("198.51.100.7", "")
@@ -0,0 +1,43 @@
+import asyncio
+from types import SimpleNamespace
+
+import fakeredis.aioredis
+from pydantic import TypeAdapter
+
+from src.database.db import redispool
+from src.repository import users as repository_users
+from src.services.contact_cache import contact_cache
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+    async def refresh(self, instance):
+        pass
+
+
+def test_avatar_change_invalidates_cached_contacts(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redispool, "client", lambda: client)
+    monkeypatch.setattr(contact_cache, "_lookup", None)
+    user = SimpleNamespace(id=7, email="owner@example.com", avatar="old.jpg")
+
+    async def get_user_by_email(email, db):
+        return user
+
+    monkeypatch.setattr(repository_users, "get_user_by_email", get_user_by_email)
+    adapter = TypeAdapter(dict)
+
+    async def read():
+        response = await contact_cache.cached_response(
+            user.id, ("id", 1), adapter, lambda: asyncio.sleep(0, {"avatar": user.avatar})
+        )
+        return response.body
+
+    async def run():
+        assert await read() == b'{"avatar":"old.jpg"}'
+        await repository_users.update_avatar_url(user.email, "new.jpg", FakeSession())
+        assert await read() == b'{"avatar":"new.jpg"}'
+
+    asyncio.run(run())
@@ -0,0 +1,65 @@
+import asyncio
+
+from src.services.contact_import import iter_lines, parse_csv, parse_ndjson
+
+
+async def _stream(body: bytes, chunk_size: int):
+    for i in range(0, len(body), chunk_size):
+        yield body[i:i + chunk_size]
+
+
+def _collect(parser, body: bytes, chunk_size: int = 7, **kwargs) -> list:
+    async def run():
+        return [item async for item in parser(_stream(body, chunk_size), **kwargs)]
+    return asyncio.run(run())
+
+
+HEADER = b"fullname,email,phone_number,birthday\n"
+
+
+def test_csv_quoted_field_spanning_lines():
+    body = HEADER + b'"Multi\nLine",ml@x.com,+380000000001,1990-01-02\nOne,one@x.com,+380000000002,1991-03-04\n'
+    for chunk_size in (1, 5, 64, len(body)):
+        assert _collect(parse_csv, body, chunk_size) == [
+            (2, {"fullname": "Multi\nLine", "email": "ml@x.com", "phone_number": "+380000000001", "birthday": "1990-01-02"}, None),
+            (4, {"fullname": "One", "email": "one@x.com", "phone_number": "+380000000002", "birthday": "1991-03-04"}, None),
+        ]
+
+
+def test_csv_crlf_blank_lines_and_literal_quote():
+    body = HEADER.replace(b"\n", b"\r\n") + b'\r\nTV 5" screen,tv@x.com,+380000000003,1992-05-06\r\n'
+    assert _collect(parse_csv, body) == [
+        (3, {"fullname": 'TV 5" screen', "email": "tv@x.com", "phone_number": "+380000000003", "birthday": "1992-05-06"}, None),
+    ]
+
+
+def test_csv_column_count_and_unterminated_quote():
+    body = HEADER + b"Short,s@x.com\n" + b'"Open,o@x.com,+380000000004,1993-07-08\n'
+    assert _collect(parse_csv, body) == [
+        (2, None, "Expected 4 columns, got 2"),
+        (3, None, "Unterminated quoted field"),
+    ]
+
+
+def test_csv_record_longer_than_limit_stops_import():
+    body = HEADER + b'"' + b"x\n" * 40 + b'",a@x.com,+380000000005,1994-09-10\n' + b"Later,l@x.com,+380000000006,1995-01-01\n"
+    rows = _collect(parse_csv, body, max_length=50)
+    assert rows == [(2, None, "Record longer than 50 bytes, import stopped")]
+
+
+def test_iter_lines_skips_overlong_line_without_buffering():
+    body = b"short\n" + b"y" * 100 + b"\nafter\n"
+    assert _collect(iter_lines, body, chunk_size=8, max_length=16) == [
+        (1, "short", None),
+        (2, None, "Line longer than 16 bytes"),
+        (3, "after", None),
+    ]
+
+
+def test_ndjson_reports_bad_lines():
+    body = b'{"fullname": "A"}\nnot json\n[1]\n\xff\n'
+    rows = _collect(parse_ndjson, body)
+    assert rows[0] == (1, {"fullname": "A"}, None)
+    assert rows[1][0] == 2 and rows[1][2].startswith("Invalid JSON")
+    assert rows[2] == (3, None, "Expected a JSON object")
+    assert rows[3] == (4, None, "Invalid UTF-8")
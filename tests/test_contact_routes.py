@@ -0,0 +1,56 @@
+from datetime import date
+from types import SimpleNamespace
+
+import fakeredis.aioredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.database.db import get_db, redispool
+from src.entity.models import Contact
+from src.repository import contacts as repository_contacts
+from src.routes import contact_router
+from src.routes.contact_router import router
+from src.services.auth import auth_service
+from src.services.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def update_contact(body, contact_id, db, user):
+        return Contact(
+            id=contact_id, fullname="Patched", email="p@example.com", phone_number="+380000000000",
+            birthday=date(1990, 1, 2), birthday_md=102, user_id=user.id,
+        )
+
+    monkeypatch.setattr(repository_contacts, "update_contact", update_contact)
+    app = FastAPI()
+    app.include_router(router, prefix="/contacts")
+    app.dependency_overrides[get_db] = lambda: None
+    app.dependency_overrides[auth_service.get_current_user] = lambda: SimpleNamespace(id=1)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("method", ["PUT", "PATCH"])
+def test_update_returns_only_public_fields(client, method):
+    body = {"fullname": "Patched", "email": "p@example.com", "phone_number": "+380000000000", "birthday": "1990-01-02"}
+    response = client.request(method, "/contacts/contacts/update/2", json=body)
+    assert response.status_code == 200
+    assert response.json() == {"id": 2, **body}
+
+
+def test_export_reports_rate_limit_headers(client, monkeypatch):
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redispool, "client", lambda: redis_client)
+    monkeypatch.setattr(RateLimiter, "_script", None)
+    monkeypatch.setattr(RateLimiter, "_redis_retry_at", 0.0)
+
+    async def export_contacts(user_id, format):
+        yield "{}\n"
+
+    monkeypatch.setattr(contact_router, "export_contacts", export_contacts)
+    response = client.get("/contacts/contacts/export")
+    assert response.status_code == 200
+    assert response.headers["RateLimit-Limit"] == "1"
+    assert response.headers["RateLimit-Remaining"] == "0"
+    assert response.headers["Content-Disposition"] == 'attachment; filename="contacts.ndjson"'
@@ -0,0 +1,43 @@
+import asyncio
+import json
+
+import fakeredis.aioredis
+
+from src.conf.config import settings
+from src.services.email_queue import DEAD_KEY, PROCESSING_KEY, RETRY_KEY, EmailWorker, build_job
+
+
+def _run_batch(worker: EmailWorker, jobs: list[str]):
+    async def run():
+        for raw in jobs:
+            await worker.redis.lpush(PROCESSING_KEY, raw)
+        await worker.send_batch(jobs)
+    asyncio.run(run())
+
+
+def test_bad_jobs_do_not_crash_the_worker():
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    worker = EmailWorker(client)
+    missing_template = json.dumps(build_job("a@example.com", "Hi", "missing.html", {}))
+    _run_batch(worker, ["not json", '["a list"]', missing_template])
+
+    async def check():
+        assert await client.llen(PROCESSING_KEY) == 0
+        assert await client.lrange(DEAD_KEY, 0, -1) == ['["a list"]', "not json"]
+        (retried,) = await client.zrange(RETRY_KEY, 0, -1)
+        assert json.loads(retried)["attempts"] == 1
+    asyncio.run(check())
+
+
+def test_job_goes_to_dead_letters_after_max_attempts():
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    worker = EmailWorker(client)
+    job = build_job("a@example.com", "Hi", "missing.html", {})
+    job["attempts"] = settings.EMAIL_MAX_ATTEMPTS - 1
+    _run_batch(worker, [json.dumps(job)])
+
+    async def check():
+        assert await client.zcard(RETRY_KEY) == 0
+        (dead,) = await client.lrange(DEAD_KEY, 0, -1)
+        assert json.loads(dead)["attempts"] == settings.EMAIL_MAX_ATTEMPTS
+    asyncio.run(check())
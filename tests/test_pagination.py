@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.repository import contacts as repository_contacts
+from src.services.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(1231, 42), int, int) == [1231, 42]
+    assert decode_cursor(encode_cursor(2**31 - 1), int) == [2**31 - 1]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        encode_cursor("x"),
+        encode_cursor(True),
+        encode_cursor(1, 2),
+        encode_cursor(None),
+        encode_cursor(2**31),
+        encode_cursor(-2**31 - 1),
+        "not base64 !",
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as err:
+        decode_cursor(cursor, int)
+    assert err.value.status_code == 400
+
+
+def test_all_contacts_page_rejects_malformed_cursor_before_querying():
+    # db is never touched: validation happens before the query is executed.
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(repository_contacts.get_all_contacts_page(10, encode_cursor("x"), db=None))
+    assert err.value.status_code == 400
@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+from src.services.profiler import WAITING_FRAME, Profiler
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_samples_are_credited_to_the_running_task():
+    profiler = Profiler(interval=0.002, maxlen=10, slow_ms=0)
+
+    async def request(name: str, work):
+        task = asyncio.current_task()
+        profile = profiler.start(task, "GET", f"/{name}", "header")
+        await work()
+        profiler.finish(task, profile, 0)
+        return profile
+
+    async def cpu():
+        await asyncio.sleep(0.01)
+        busy(0.2)
+
+    async def io():
+        await asyncio.sleep(0.25)
+
+    async def run():
+        return await asyncio.gather(request("cpu", cpu), request("io", io))
+
+    cpu_profile, io_profile = asyncio.run(run())
+    assert any(stack.endswith(":busy") for stack in cpu_profile.samples)
+    assert set(io_profile.samples) == {WAITING_FRAME}
+    assert io_profile.samples[WAITING_FRAME] > 0
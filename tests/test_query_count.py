@@ -0,0 +1,77 @@
+"""
+Locks in one query per list request. Needs a Postgres database migrated to
+head at SQLALCHEMY_DATABASE_URL and is skipped without one; the data is
+inserted in a transaction that is rolled back.
+"""
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.db import sessionmanager
+from src.database.query_counter import assert_max_queries
+from src.entity.models import Contact, User
+from src.repository import contacts as repository_contacts
+from src.schemas import ContactPage
+
+
+PAGE = 5
+
+
+async def list_pages(db: AsyncSession, user: User):
+    """Yields (name, call) for the first two pages of every list path."""
+    for name, fetch in {
+        "all_page": lambda cursor: repository_contacts.get_all_contacts_page(PAGE, cursor, db),
+        "search": lambda cursor: repository_contacts.search_contacts("Query Count", PAGE, cursor, db, user),
+        "birthdays_page": lambda cursor: repository_contacts.get_upcoming_birthdays_from_new_date_page(
+            "2024-06-01", PAGE, cursor, db, user
+        ),
+    }.items():
+        cursor = None
+        for _ in range(2):
+            with assert_max_queries(sessionmanager.engine, 1):
+                page = await fetch(cursor)
+                # Serializing must not load anything either.
+                body = ContactPage.model_validate(page).model_dump()
+            assert len(body["items"]) == PAGE, name
+            cursor = body["next_cursor"]
+            assert cursor is not None, name
+
+
+async def run():
+    try:
+        conn = await sessionmanager.engine.connect()
+    except (OSError, DBAPIError) as err:
+        pytest.skip(f"Postgres unavailable: {err}")
+    try:
+        await conn.begin()
+        db = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        user = User(username="query-count", email="query-count@example.com", password="-", confirmed=True)
+        db.add(user)
+        await db.flush()
+        await db.execute(
+            insert(Contact),
+            [
+                {
+                    "fullname": f"Query Count {n}",
+                    "email": f"query-count-{n}@example.com",
+                    "phone_number": "+380000000000",
+                    "birthday": date(1990, 6, 1 + n % 5),
+                    "user_id": user.id,
+                }
+                for n in range(3 * PAGE)
+            ],
+        )
+        await list_pages(db, user)
+        await db.close()
+    finally:
+        await conn.rollback()
+        await conn.close()
+        await sessionmanager.engine.dispose()
+
+
+def test_list_paths_run_one_query_per_page():
+    asyncio.run(run())
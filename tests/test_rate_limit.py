@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+
+import fakeredis.aioredis
+import pytest
+import redis.asyncio as redis
+from fastapi import HTTPException, Request, Response
+
+from src.database.db import redispool
+from src.services.rate_limit import RateLimiter
+
+
+def call(limiter: RateLimiter, user_id: int) -> Response:
+    request = Request({"type": "http", "method": "POST", "path": "/contacts", "headers": []})
+    response = Response()
+    asyncio.run(limiter(request, response, SimpleNamespace(id=user_id)))
+    return response
+
+
+def exhaust(limiter: RateLimiter, user_id: int, capacity: int):
+    remaining = []
+    for _ in range(capacity):
+        response = call(limiter, user_id)
+        assert response.headers["RateLimit-Limit"] == str(capacity)
+        remaining.append(int(response.headers["RateLimit-Remaining"]))
+    assert remaining == list(reversed(range(capacity)))
+    with pytest.raises(HTTPException) as err:
+        call(limiter, user_id)
+    assert err.value.status_code == 429
+    assert err.value.headers["RateLimit-Limit"] == str(capacity)
+    assert err.value.headers["RateLimit-Remaining"] == "0"
+
+
+def test_limit_header_reports_times_plus_burst(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redispool, "client", lambda: client)
+    monkeypatch.setattr(RateLimiter, "_script", None)
+    monkeypatch.setattr(RateLimiter, "_redis_retry_at", 0.0)
+
+    exhaust(RateLimiter(times=2, seconds=60, burst=3), user_id=1, capacity=5)
+
+
+def test_local_fallback_enforces_the_same_capacity(monkeypatch):
+    attempts = []
+
+    def unavailable():
+        attempts.append(1)
+        raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(redispool, "client", unavailable)
+    monkeypatch.setattr(RateLimiter, "_redis_retry_at", 0.0)
+
+    exhaust(RateLimiter(times=2, seconds=60, burst=1), user_id=2, capacity=3)
+    # Redis is not tried again until the backoff has elapsed.
+    assert len(attempts) == 1
+
+    monkeypatch.setattr(RateLimiter, "_redis_retry_at", 0.0)
+    with pytest.raises(HTTPException):
+        call(RateLimiter(times=2, seconds=60, burst=1), user_id=2)
+    assert len(attempts) == 2
@@ -0,0 +1,25 @@
+import asyncio
+
+import fakeredis.aioredis
+
+from src.database.db import redispool
+from src.entity.models import Role
+from src.services.token_store import refresh_token_store, role_changes
+
+
+def test_stores_use_the_client_current_at_call_time(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    # Patched after the module-level stores were created.
+    monkeypatch.setattr(redispool, "client", lambda: client)
+
+    async def run():
+        await refresh_token_store.issue("a@example.com", "jti-1", 60)
+        assert await client.get("refresh:jti-1") == "a@example.com"
+        assert await refresh_token_store.rotate("a@example.com", "jti-1", "jti-2", 60)
+        assert not await refresh_token_store.rotate("a@example.com", "jti-1", "jti-3", 60)
+        assert await client.exists("refresh:jti-2") == 0
+
+        await role_changes.record("a@example.com", Role.admin)
+        assert await client.get("role:a@example.com") == "admin"
+
+    asyncio.run(run())